@@ -4,14 +4,25 @@ import pandas as pd
 import time
 
 # Import Modules
-from prospector.maps_scraper import find_leads
-from harvester.gbp_data import normalize_gbp_data
-from audit.leakage_index import calculate_rli_score
-from audit.roi_calculator import calculate_money_loss
-from report.pdf_generator import create_audit_pdf
-from modules.pipeline_manager import add_lead, load_db, update_lead_status, delete_lead, get_metrics
+from prospector.maps_scraper import find_leads, stream_leads, stream_area_leads
+from harvester.gbp_data import normalize_gbp_data, lead_key
+from audit.audit_memo import audit_lead
+from report.pdf_cache import get_audit_pdf
+from report.batch_render import export_zip
+from modules.pipeline_manager import (
+    add_lead, load_db, update_lead_status, delete_lead, get_metrics, tracked_ids,
+    count_leads, query_leads, list_currencies, get_funnel, PIPELINE_STATUSES,
+)
+from modules.lead_index import mark_leads
 from modules.outreach import generate_cold_email
 from modules.scan_history import save_scan, load_history
+from modules.ingest import score_lead, track_leads, import_scan
+from modules.rescoring import score_key, start_background_rescore, stop_background_rescore, get_rescore_status
+from modules import tracing
+from prospector import response_cache
+from prospector.maps_scraper import get_page_stats
+from report import pdf_cache
+from audit import audit_memo
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="CRGG Growth OS", layout="wide", initial_sidebar_state="collapsed")
@@ -181,8 +192,7 @@ if selected == "Auditor":
                         data['website'] = target_web
                         st.toast("Applied Manual Website Override", icon="🔧")
 
-                    audit = calculate_rli_score(data)
-                    roi = calculate_money_loss(audit['rli_score'], 500, 50)
+                    audit, roi = audit_lead(data)
                     
                     # RESULTS DISPLAY
                     st.markdown("<hr>", unsafe_allow_html=True)
@@ -196,10 +206,11 @@ if selected == "Auditor":
                         </div>
                         """, unsafe_allow_html=True)
                     with r2:
-                        pdf = create_audit_pdf(data['name'], audit, roi, currency_symbol, data)
+                        pdf = get_audit_pdf(data['name'], audit, roi, currency_symbol, data)
                         st.download_button("📄 DOWNLOAD REPORT", data=pdf, file_name=f"{data['name']}_Audit.pdf", mime="application/pdf", use_container_width=True)
                         if st.button("📥 Add to Pipeline", use_container_width=True):
                             target_lead['audit_score'], target_lead['monthly_gap'], target_lead['currency'] = audit['rli_score'], roi['monthly_loss_min'], currency_symbol
+                            target_lead['score_key'] = score_key(data)
                             add_lead(target_lead)
                             st.success("Added!")
 
@@ -209,37 +220,94 @@ if selected == "Auditor":
 elif selected == "Prospector":
     
     with st.container():
-        c1, c2, c3 = st.columns([2, 1, 1])
+        c1, c2, c_mode, c3 = st.columns([2, 1, 1, 1])
         with c1: keyword = st.text_input("Industry", placeholder="e.g. Emergency Plumber")
         with c2: location = st.text_input("Region", placeholder="e.g. Los Angeles")
+        with c_mode: coverage = st.selectbox("Coverage", ["City center", "Area 3×3", "Area 5×5"], help="Area modes tile the region into map viewports and scan them in parallel")
         with c3:
             st.write("") 
             st.write("") 
             run_btn = st.button("🚀 DEPLOY SCAN", use_container_width=True, type="primary")
 
     if 'scan_results' not in st.session_state: st.session_state['scan_results'] = []
+    if 'pdf_requested' not in st.session_state: st.session_state['pdf_requested'] = set()
+
+    with st.expander("📜 Past Scans"):
+        past = load_history(limit=10)
+        if not past: st.caption("No scans yet.")
+        for scan in past:
+            h1, h2 = st.columns([3, 1])
+            h1.caption(f"{scan['timestamp']} · {scan['keyword']} in {scan['location']} · {scan['count']} leads")
+            if h2.button("📥 Track All", key=f"imp_{scan['id']}", use_container_width=True):
+                rep = import_scan(scan['id'], currency=get_currency_symbol(scan['location']))
+                if rep is None: st.toast("Scan no longer in history", icon="⚠️")
+                else: st.toast(f"Added {rep['added']}, {rep['skipped']} already tracked", icon="✅")
 
     if run_btn and keyword and location:
-        with st.spinner("Hunting for weak profiles..."):
-            raw_leads = find_leads(keyword, location)
-            if not raw_leads:
-                st.warning("No leads found.")
-            else:
-                for lead in raw_leads: lead['search_location'] = location 
-                st.session_state['scan_results'] = raw_leads
-                save_scan(keyword, location, raw_leads)
-                st.toast(f"Found {len(raw_leads)} Targets", icon="✅")
+        # Stream: show (and audit) each page's leads as it lands, sort once at the end
+        raw_leads, rows, seen_before, live = [], [], {}, st.empty()
+        live_symbol = get_currency_symbol(location)
+        if coverage == "City center": pages = stream_leads(keyword, location)
+        else: pages = stream_area_leads(keyword, location, grid=int(coverage[-1]))
+        for page_leads in pages:
+            marks = mark_leads(page_leads)
+            for lead in page_leads:
+                lead['search_location'] = location
+                mark = marks[lead_key(lead)]
+                seen_before[lead_key(lead)] = mark['times_seen']
+                if mark['tracked']: gap = "✅ Tracked"  # Already in the pipeline: no need to re-audit
+                else: gap = f"{live_symbol}{audit_lead(normalize_gbp_data(lead))[1]['monthly_loss_min']:,}"
+                raw_leads.append(lead)
+                rows.append({'Business': lead['business_name'], 'Rating': lead['rating'], 'Reviews': lead['reviews'], 'Gap / mo': gap})
+            with live.container():
+                st.caption(f"🦈 Hunting for weak profiles... {len(raw_leads)} found so far")
+                st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        live.empty()
+
+        if not raw_leads:
+            st.warning("No leads found.")
+        else:
+            raw_leads.sort(key=lambda x: x['weakness_score'], reverse=True)
+            st.session_state['scan_results'] = raw_leads
+            st.session_state['seen_before'] = seen_before
+            save_scan(keyword, location, raw_leads)
+            st.toast(f"Found {len(raw_leads)} Targets", icon="✅")
 
     results = st.session_state['scan_results']
     if results:
-        if st.button("Clear Results"): st.session_state['scan_results'] = []; st.experimental_rerun()
+        tracked = tracked_ids(lead_key(l) for l in results)
+        seen_before = st.session_state.get('seen_before', {})
+        if tracked and st.checkbox(f"Hide {len(tracked)} already tracked", value=True):
+            results = [l for l in results if lead_key(l) not in tracked]
+        c_clear, c_track, c_zip = st.columns(3)
+        with c_clear:
+            if st.button("Clear Results"): st.session_state['scan_results'] = []; st.rerun()
+        with c_track:
+            untracked = [l for l in results if lead_key(l) not in tracked]
+            if untracked and st.button(f"📥 Track All ({len(untracked)})", use_container_width=True):
+                # One pipeline commit per currency instead of one per lead
+                by_currency = {}
+                for l in untracked: by_currency.setdefault(get_currency_symbol(l.get('search_location', location)), []).append(l)
+                added = sum(track_leads(group, sym)['added'] for sym, group in by_currency.items())
+                st.toast(f"Added {added} leads", icon="✅"); st.rerun()
+        with c_zip:
+            if st.button("📦 Export All PDFs (ZIP)", use_container_width=True):
+                bar = st.progress(0.0, text="Rendering reports...")
+                zip_bytes = export_zip(
+                    [(l, get_currency_symbol(l.get('search_location', location))) for l in results],
+                    on_progress=lambda done, total: bar.progress(done / total, text=f"Rendering reports... {done}/{total}"),
+                )
+                st.download_button("⬇️ Download ZIP", data=zip_bytes, file_name="Scan_Audits.zip", mime="application/zip", use_container_width=True)
             
         for i, lead in enumerate(results):
             loc = lead.get('search_location', location) 
             currency_symbol = get_currency_symbol(loc)
             data = normalize_gbp_data(lead)
-            audit = calculate_rli_score(data)
-            roi = calculate_money_loss(audit['rli_score'], 500, 50) 
+            audit, roi = audit_lead(data)
+            key = lead_key(lead)
+            if key in tracked: seen_tag = "<span>✅ Tracked</span>"
+            elif seen_before.get(key): seen_tag = f"<span>👁️ Seen in {seen_before[key]} earlier scan(s)</span>"
+            else: seen_tag = ""
             
             with st.container():
                 c_info, c_actions = st.columns([3, 2])
@@ -250,6 +318,7 @@ elif selected == "Prospector":
                         <div class="biz-meta">
                             <span class="rating-badge">⭐ {data['rating']} ({data['reviews']})</span>
                             <span>📍 {data['address'][:35]}...</span>
+                            {seen_tag}
                         </div>
                         <div class="biz-meta">
                             <span class="gap-badge">GAP: {currency_symbol}{roi['monthly_loss_min']:,}/mo</span>
@@ -271,12 +340,17 @@ elif selected == "Prospector":
                         else: st.button("No Web", disabled=True, key=f"nw_{i}", use_container_width=True)
                     with b3:
                         if st.button("📥 Track", key=f"add_{i}", use_container_width=True):
-                            lead['audit_score'], lead['monthly_gap'], lead['currency'] = audit['rli_score'], roi['monthly_loss_min'], currency_symbol
-                            if add_lead(lead): st.toast("Added", icon="✅")
+                            if add_lead(score_lead(lead, currency_symbol)): st.toast("Added", icon="✅")
                             else: st.toast("Already Tracking", icon="⚠️")
                     with b4:
-                        pdf = create_audit_pdf(data['name'], audit, roi, currency_symbol, data)
-                        st.download_button("📄 PDF", data=pdf, file_name=f"{data['name']}_Audit.pdf", key=f"dl_{i}", use_container_width=True)
+                        # Lazy: only render once the user asks for this lead's PDF (then served from cache)
+                        requested = lead_key(lead) in st.session_state['pdf_requested']
+                        if not requested and st.button("📄 PDF", key=f"mk_{i}", use_container_width=True):
+                            st.session_state['pdf_requested'].add(lead_key(lead))
+                            requested = True
+                        if requested:
+                            pdf = get_audit_pdf(data['name'], audit, roi, currency_symbol, data)
+                            st.download_button("⬇️ PDF", data=pdf, file_name=f"{data['name']}_Audit.pdf", key=f"dl_{i}", use_container_width=True)
             
             st.markdown("---") 
 
@@ -292,12 +366,47 @@ elif selected == "Pipeline":
     m3.metric("Status", "Active")
     st.divider()
     
-    db = load_db()
-    if not db: st.info("Pipeline is empty.")
+    if 'pipe_focus' not in st.session_state: st.session_state['pipe_focus'] = None
+
+    if not count: st.info("Pipeline is empty.")
     else:
-        for i, lead in enumerate(db): 
+        if st.button("📦 Export Pipeline PDFs (ZIP)"):
+            db = load_db()
+            bar = st.progress(0.0, text="Rendering reports...")
+            zip_bytes = export_zip(
+                [(l, l.get('currency', "$")) for l in db],
+                on_progress=lambda done, total: bar.progress(done / total, text=f"Rendering reports... {done}/{total}"),
+            )
+            st.download_button("⬇️ Download ZIP", data=zip_bytes, file_name="Pipeline_Audits.zip", mime="application/zip")
+
+        # --- FILTERS (run as SQL, only one page of leads is loaded) ---
+        f1, f2, f3, f4, f5 = st.columns([2, 1, 1, 1, 1])
+        with f1: f_status = st.multiselect("Status", PIPELINE_STATUSES)
+        with f2: f_currency = st.multiselect("Currency", list_currencies())
+        with f3: f_min = st.number_input("Min Gap", min_value=0, value=0, step=500)
+        with f4: f_max = st.number_input("Max Gap (0 = any)", min_value=0, value=0, step=500)
+        with f5: f_sort = st.selectbox("Sort", ["Biggest Gap", "Newest", "Oldest", "Status"])
+        filters = {
+            "status": f_status or None,
+            "currency": f_currency or None,
+            "min_gap": f_min or None,
+            "max_gap": f_max or None,
+        }
+        sort, descending = {"Biggest Gap": ("gap", True), "Newest": ("added", True), "Oldest": ("added", False), "Status": ("status", False)}[f_sort]
+
+        matches = count_leads(**filters)
+        p1, p2, p3 = st.columns([1, 1, 3])
+        with p1: page_size = st.selectbox("Per Page", [10, 25, 50], index=1)
+        pages = max(1, -(-matches // page_size))
+        with p2: page = st.number_input("Page", min_value=1, max_value=pages, value=1)
+        with p3: st.caption(f"{matches:,} of {count:,} leads match · page {page} of {pages}")
+
+        page_leads = query_leads(**filters, sort=sort, descending=descending, limit=page_size, offset=(page - 1) * page_size)
+        for lead in page_leads:
+            pk = lead_key(lead)
             sym = lead.get('currency', "$")
-            with st.expander(f"{lead['business_name']} | Gap: {sym}{lead.get('monthly_gap', 0):,}"):
+            focused = st.session_state['pipe_focus'] == pk
+            with st.expander(f"{lead['business_name']} | Gap: {sym}{lead.get('monthly_gap') or 0:,} | {lead.get('status', 'New Lead')}", expanded=focused):
                 
                 c_map, c_web, c_regen = st.columns([1, 1, 2])
                 with c_map:
@@ -305,34 +414,107 @@ elif selected == "Pipeline":
                 with c_web:
                     if lead.get('website'): st.link_button("🌐 Web", lead['website'])
                 with c_regen:
-                    if st.button("📄 Regenerate Report", key=f"regen_pipe_{i}"):
+                    if st.button("📄 Regenerate Report", key=f"regen_pipe_{pk}"):
                         data = normalize_gbp_data(lead)
-                        audit = calculate_rli_score(data)
-                        roi = calculate_money_loss(audit['rli_score'], 500, 50)
-                        pdf = create_audit_pdf(data['name'], audit, roi, sym, data)
-                        st.download_button("Download", data=pdf, file_name=f"{data['name']}_Audit.pdf", key=f"redl_pipe_{i}")
+                        audit, roi = audit_lead(data)
+                        pdf = get_audit_pdf(data['name'], audit, roi, sym, data)
+                        st.download_button("Download", data=pdf, file_name=f"{data['name']}_Audit.pdf", key=f"redl_pipe_{pk}")
                 
                 st.divider()
                 c1, c2 = st.columns([1, 2])
                 with c1:
-                    new_st = st.selectbox("Status", ["New Lead", "Outreach", "Negotiation", "Won", "Lost"], index=["New Lead", "Outreach", "Negotiation", "Won", "Lost"].index(lead.get('status', "New Lead")), key=f"st_{i}")
-                    if new_st != lead.get('status'): update_lead_status(lead['place_id'], new_st); st.experimental_rerun()
-                    if st.button("🗑️ Delete", key=f"del_pipe_{i}"): delete_lead(lead['place_id']); st.experimental_rerun()
+                    new_st = st.selectbox("Status", PIPELINE_STATUSES, index=PIPELINE_STATUSES.index(lead.get('status', "New Lead")), key=f"st_{pk}")
+                    if new_st != lead.get('status'): update_lead_status(pk, new_st); st.rerun()
+                    if st.button("🗑️ Delete", key=f"del_pipe_{pk}"): delete_lead(pk); st.rerun()
                 with c2:
-                    t1, t2 = st.tabs(["✉️ Email", "📝 Notes"])
-                    with t1:
-                        kind = st.radio("Template", ["Initial", "Follow Up"], horizontal=True, key=f"r_pipe_{i}")
-                        s, b = generate_cold_email(lead, f"T1 ({kind})")
-                        st.text_input("Subject", s, key=f"s_pipe_{i}")
-                        st.text_area("Body", b, height=150, key=f"b_pipe_{i}")
-                    with t2:
-                        st.text_area("Notes", lead.get('notes', ''), key=f"n_pipe_{i}")
+                    # Lazy: drafts and notes are only built for the lead being worked on
+                    if not focused:
+                        if st.button("✉️ Open Outreach & Notes", key=f"focus_{pk}"):
+                            st.session_state['pipe_focus'] = pk; st.rerun()
+                    else:
+                        t1, t2 = st.tabs(["✉️ Email", "📝 Notes"])
+                        with t1:
+                            kind = st.radio("Template", ["Initial", "Follow Up"], horizontal=True, key=f"r_pipe_{pk}")
+                            s, b = generate_cold_email(lead, f"T1 ({kind})")
+                            st.text_input("Subject", s, key=f"s_pipe_{pk}")
+                            st.text_area("Body", b, height=150, key=f"b_pipe_{pk}")
+                        with t2:
+                            st.text_area("Notes", lead.get('notes', ''), key=f"n_pipe_{pk}")
 
 # ==========================================
 # 📈 VIEW 4: ANALYTICS
 # ==========================================
 elif selected == "Mission Control":
     st.markdown("## Deployment Registry")
-    db = load_db()
-    if db: st.dataframe(pd.DataFrame(db)[['business_name', 'status', 'monthly_gap']], use_container_width=True)
-    else: st.info("No data.")
+
+    # --- RE-SCORING (after rule / ROI changes) ---
+    job = get_rescore_status()
+    r1, r2 = st.columns([1, 3])
+    with r1:
+        if job['running']:
+            if st.button("⏹️ Stop Re-scoring"): stop_background_rescore()
+        elif st.button("♻️ Re-score Pipeline"):
+            start_background_rescore(); st.rerun()
+    with r2:
+        if job['running']:
+            st.progress(job['done'] / job['total'] if job['total'] else 0.0, text=f"Re-scoring... {job['done']}/{job['total']}")
+        elif job['error']: st.error(f"Re-scoring failed: {job['error']}")
+        elif job['report']:
+            rep = job['report']
+            delta = " · ".join(f"{cur}{d:+,.0f}/mo" for cur, d in rep['value_delta'].items()) or "no change"
+            st.caption(f"{'Done' if rep['complete'] else 'Paused'}: {rep['rescored']} re-scored, {rep['unchanged']} up to date. Pipeline gap delta: {delta}")
+
+    # --- FUNNEL (maintained aggregates, no pipeline scan) ---
+    funnel = get_funnel()
+    if not funnel['leads']: st.info("No data.")
+    else:
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("Leads", f"{funnel['leads']:,}")
+        k2.metric("Pipeline Value", f"${funnel['value']:,.0f}")
+        k3.metric("Win Rate", f"{funnel['win_rate']:.0%}" if funnel['win_rate'] is not None else "—")
+        k4.metric("Monthly Gap", " · ".join(f"{cur or '?'}{gap:,.0f}" for cur, gap in funnel['gap_by_currency'].items()))
+
+        f1, f2 = st.columns([2, 1])
+        with f1:
+            st.dataframe(pd.DataFrame([
+                {"stage": s['status'], "leads": s['leads'], "reached": s['reached'],
+                 "conversion": f"{s['conversion']:.0%}" if s['conversion'] is not None else "—",
+                 "value": funnel['by_status'][s['status']]['value']}
+                for s in funnel['stages']
+            ] + [{"stage": "Lost", "leads": funnel['by_status']['Lost']['leads'], "reached": None, "conversion": "—",
+                  "value": funnel['by_status']['Lost']['value']}]), use_container_width=True, hide_index=True)
+        with f2:
+            st.bar_chart(pd.Series({win or "Unset": n for win, n in funnel['win_probability'].items()}, name="Win Probability"))
+
+        top = query_leads(sort="gap", descending=True, limit=100)
+        st.dataframe(pd.DataFrame(top)[['business_name', 'status', 'monthly_gap']], use_container_width=True)
+        if funnel['leads'] > 100: st.caption(f"Top 100 of {funnel['leads']:,} by gap — the Pipeline tab pages through the rest.")
+
+    # --- PERFORMANCE (in-process tracing + cache hit rates) ---
+    with st.expander("⏱️ Performance"):
+        tracing.enable(st.toggle("Record timings", value=tracing.is_enabled(), help="Times SerpAPI pages, normalize/audit, PDF renders and pipeline/history reads & writes"))
+        hit_rates = {
+            "serpapi_cache_hit_rate": response_cache.get_stats()["hit_rate"],
+            "pdf_cache_hit_rate": pdf_cache.get_stats()["hit_rate"],
+            "audit_memo_hit_rate": audit_memo.get_stats()["hit_rate"],
+        }
+        h1, h2, h3, h4 = st.columns(4)
+        h1.metric("SerpAPI Cache Hits", f"{hit_rates['serpapi_cache_hit_rate']:.0%}")
+        h2.metric("PDF Cache Hits", f"{hit_rates['pdf_cache_hit_rate']:.0%}")
+        h3.metric("Audit Memo Hits", f"{hit_rates['audit_memo_hit_rate']:.0%}")
+        h4.metric("Leads / Credit", f"{get_page_stats()['leads_per_credit']:.1f}")
+
+        stages = tracing.stage_stats()
+        if stages:
+            st.dataframe(pd.DataFrame([
+                {"stage": name, "calls": s['count'], "p50 ms": round(s['p50_ms'], 2), "p99 ms": round(s['p99_ms'], 2), "max ms": round(s['max_ms'], 2), "errors": s['errors']}
+                for name, s in stages.items()
+            ]), use_container_width=True, hide_index=True)
+            counters = tracing.get_counters()
+            if counters: st.caption(" · ".join(f"{name}: {n:,}" for name, n in counters.items()))
+            e1, e2, e3 = st.columns(3)
+            e1.download_button("⬇️ Prometheus", data=tracing.prometheus_text(hit_rates), file_name="crgg_metrics.prom", mime="text/plain")
+            e2.download_button("⬇️ JSONL", data=tracing.jsonl_text(), file_name="crgg_spans.jsonl", mime="application/jsonl")
+            if e3.button("🧹 Reset Timings"): tracing.reset(); st.rerun()
+        elif tracing.is_enabled(): st.info("No timings yet: run a scan or open the pipeline.")
+        else: st.info("Timing is off. Switch it on (or start the app with CRGG_TRACE=1) to see p50/p99 per stage.")
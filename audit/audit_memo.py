@@ -0,0 +1,76 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from audit.leakage_index import calculate_rli_score
+from audit.roi_calculator import calculate_money_loss, DEFAULT_AVG_SALE, DEFAULT_EST_CALLS
+from audit.rule_engine import get_engine
+from modules.tracing import traced
+
+MAX_MEMO_ENTRIES = 20000
+
+_lock = threading.Lock()
+_memo = OrderedDict()          # (rule version, field values, avg_sale, est_calls) -> (audit, roi)
+_memo_version = None
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+def lead_fingerprint(data):
+    """
+    Stable hash of exactly the lead fields the rules read (after aliases and
+    defaults). Two leads with the same fingerprint always audit identically.
+    """
+    values = get_engine().extract(data)
+    blob = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+@traced("audit")
+def audit_lead(data, avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS):
+    """
+    Memoized calculate_rli_score + calculate_money_loss for one normalized lead.
+    Returns fresh (audit, roi) dicts. Keyed by the rule-set version, so
+    recompiling the rules (new thresholds) invalidates every cached audit.
+    """
+    global _memo_version
+    engine = get_engine()
+    values = engine.extract(data)
+    try:
+        key = (engine.version, tuple(values.values()), avg_sale, est_calls)
+        hash(key)
+    except TypeError:
+        key = (engine.version, json.dumps(list(values.values()), default=str), avg_sale, est_calls)
+
+    with _lock:
+        if _memo_version != engine.version:
+            if _memo: _stats["invalidations"] += 1
+            _memo.clear()
+            _memo_version = engine.version
+        cached = _memo.get(key)
+        if cached is not None:
+            _memo.move_to_end(key)
+            _stats["hits"] += 1
+
+    if cached is None:
+        audit = calculate_rli_score(data)
+        roi = calculate_money_loss(audit['rli_score'], avg_sale, est_calls)
+        cached = (audit, roi)
+        with _lock:
+            _stats["misses"] += 1
+            _memo[key] = cached
+            while len(_memo) > MAX_MEMO_ENTRIES:
+                _memo.popitem(last=False)
+                _stats["evictions"] += 1
+
+    audit, roi = cached
+    return dict(audit, issues=list(audit["issues"])), dict(roi)
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats, entries=len(_memo))
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+def clear_memo():
+    with _lock:
+        _memo.clear()
@@ -1,4 +1,8 @@
-def calculate_money_loss(rli_score, avg_sale, est_calls=50):
+# Default ROI assumptions used across the app (average sale value, monthly calls)
+DEFAULT_AVG_SALE = 500
+DEFAULT_EST_CALLS = 50
+
+def calculate_money_loss(rli_score, avg_sale, est_calls=DEFAULT_EST_CALLS):
     """
     MODULE 4: SCORING & ROI CALCULATOR
     Spec: "Convert leaks into real money numbers."
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import string
+import threading
+
+import numpy as np
+
+from audit.rules import RULES, FIELDS, MAX_SCORE, SEVERE_ABOVE, MODERATE_ABOVE
+
+# How each op reads as Python (scalar) and as a NumPy mask (batch)
+_SCALAR_OPS = {
+    "<": "{f} < {v}", "<=": "{f} <= {v}", ">": "{f} > {v}", ">=": "{f} >= {v}",
+    "==": "{f} == {v}", "!=": "{f} != {v}", "falsy": "not {f}", "truthy": "bool({f})",
+}
+_BATCH_OPS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "!=": np.not_equal,
+}
+
+class CompiledRules:
+    """
+    A rule list compiled once into a single generated Python function (scalar)
+    and a list of NumPy mask builders (batch). Adding a rule adds one
+    comparison to the generated function, not another Python call per lead.
+    """
+
+    def __init__(self, rules, fields=FIELDS):
+        self.rules = [dict(rule) for rule in rules]
+        self.fields = {name: fields[name] for name in dict.fromkeys(r["field"] for r in self.rules)}
+        self.weights = [rule["weight"] for rule in self.rules]
+        self.version = _ruleset_version(self.rules, self.fields)
+        self._evaluate = self._compile_scalar()
+        self._placeholders = [
+            [name for _, name, _, _ in string.Formatter().parse(rule["issue"]) if name]
+            for rule in self.rules
+        ]
+
+    # --- SCALAR ---
+
+    def _compile_scalar(self):
+        exprs = []
+        for rule in self.rules:
+            op, field, value = rule["op"], rule["field"], rule.get("value")
+            if op not in _SCALAR_OPS: raise ValueError(f"Rule {rule['id']}: unknown op {op!r}")
+            if not field.isidentifier(): raise ValueError(f"Rule {rule['id']}: bad field {field!r}")
+            if op in _BATCH_OPS and not isinstance(value, (int, float)):
+                raise ValueError(f"Rule {rule['id']}: threshold must be a number")
+            exprs.append(_SCALAR_OPS[op].format(f=field, v=repr(value)))
+
+        source = f"def evaluate({', '.join(self.fields)}):\n    return ({', '.join(exprs)},)\n"
+        namespace = {}
+        exec(compile(source, "<audit rules>", "exec"), namespace)
+        return namespace["evaluate"]
+
+    def extract(self, data):
+        """Pulls the rule fields out of a lead dict (normalized or raw), applying aliases and defaults."""
+        values = {}
+        for field, (keys, default) in self.fields.items():
+            values[field] = default
+            for key in keys:
+                if key in data:
+                    values[field] = data[key]
+                    break
+        return values
+
+    def evaluate(self, data):
+        """Returns (score, fired_rules, field_values) for one lead."""
+        values = self.extract(data)
+        hits = self._evaluate(**values)
+        score = min(sum(w for w, hit in zip(self.weights, hits) if hit), MAX_SCORE)
+        return score, [rule for rule, hit in zip(self.rules, hits) if hit], values
+
+    # --- BATCH ---
+
+    def evaluate_frame(self, df):
+        """Returns (scores, {rule_id: bool mask}) for every row of a DataFrame."""
+        columns = {field: self._column(df, field) for field in self.fields}
+        masks = {}
+        score = np.zeros(len(df), dtype=np.int64)
+        for rule, weight in zip(self.rules, self.weights):
+            col = columns[rule["field"]]
+            if rule["op"] in _BATCH_OPS:
+                mask = np.asarray(_BATCH_OPS[rule["op"]](col, rule["value"]), dtype=bool)
+            else:
+                truthy = np.fromiter((bool(x) for x in col), dtype=bool, count=len(col))
+                mask = ~truthy if rule["op"] == "falsy" else truthy
+            masks[rule["id"]] = mask
+            score += weight * mask
+        return np.minimum(score, MAX_SCORE), masks
+
+    def issue_lists(self, df, masks):
+        """Per-row issue strings (same text and order as the scalar path)."""
+        messages = []
+        for rule, names in zip(self.rules, self._placeholders):
+            mask = masks[rule["id"]].tolist()
+            args = {name: self._column(df, name).tolist() for name in names}
+            messages.append((rule["issue"], mask, args))
+
+        issues = []
+        for row in range(len(df)):
+            issues.append([
+                template.format(**{name: values[row] for name, values in args.items()})
+                for template, mask, args in messages if mask[row]
+            ])
+        return issues
+
+    def _column(self, df, field):
+        keys, default = self.fields.get(field) or FIELDS.get(field, ((field,), None))
+        for key in keys:
+            if key in df.columns: return df[key].to_numpy()
+        return np.full(len(df), default, dtype=object)
+
+def issue_text(rule, values):
+    return rule["issue"].format(**values)
+
+def leak_band(score):
+    """'severe', 'moderate' or 'low' - each entry point maps these to its own labels."""
+    if score > SEVERE_ABOVE: return "severe"
+    if score > MODERATE_ABOVE: return "moderate"
+    return "low"
+
+def leak_bands(scores):
+    return np.select([scores > SEVERE_ABOVE, scores > MODERATE_ABOVE], ["severe", "moderate"], default="low")
+
+def _ruleset_version(rules, fields):
+    blob = json.dumps([rules, fields, MAX_SCORE, SEVERE_ABOVE, MODERATE_ABOVE], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """The compiled default rule set from audit/rules.py (compiled on first use)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None: _engine = CompiledRules(RULES)
+    return _engine
+
+def reload_rules(rules=None):
+    """Recompiles from `rules` (or audit/rules.RULES); the new version invalidates memoized audits."""
+    global _engine
+    with _engine_lock:
+        _engine = CompiledRules(RULES if rules is None else rules)
+    return _engine
@@ -1,44 +1,79 @@
 # MODULE 3: RULES DEFINITION
 # These are the specific logical triggers for leaks defined in your spec.
+# Rules are plain data: audit/rule_engine.py compiles them once and every
+# audit entry point (leakage_index, logic, modules/audit_engine, batch)
+# scores with the same compiled set, so they can never disagree.
+#
+#   field   - normalized lead field the rule reads (see FIELDS)
+#   op      - "<", "<=", ">", ">=", "==", "!=", "falsy" or "truthy"
+#   value   - threshold for comparison ops
+#   weight  - leak points added when the rule fires
+#   issue   - short issue line; {field} placeholders are filled from the lead
+#   area / impact / problem / fix - consulting-report row for the same leak
 
-def check_trust_leak(reviews, rating):
-    issues = []
-    score = 0
-    # Spec: "if reviews < 50: leak += 15"
-    if reviews < 50:
-        score += 15
-        issues.append("Trust Gap: <50 Reviews (Customers don't trust you)")
-    
-    # Spec: "Rating < 4.3"
-    if rating < 4.3:
-        score += 15
-        issues.append(f"Reputation Leak: Rating {rating} is below trust threshold (4.3)")
-        
-    return score, issues
+RULES = [
+    {
+        # Spec: "if reviews < 50: leak += 15"
+        "id": "low_reviews", "field": "reviews", "op": "<", "value": 50, "weight": 15,
+        "issue": "Trust Gap: <50 Reviews (Customers don't trust you)",
+        "area": "Trust & Review Gaps", "impact": "High",
+        "problem": "Only {reviews} reviews found (Threshold is 50).",
+        "fix": "Launch automated review request campaign immediately.",
+    },
+    {
+        # Spec: "Rating < 4.3"
+        "id": "low_rating", "field": "rating", "op": "<", "value": 4.3, "weight": 15,
+        "issue": "Reputation Leak: Rating {rating} is below trust threshold (4.3)",
+        "area": "Trust & Review Gaps", "impact": "High",
+        "problem": "Rating is {rating} (Target: 4.8+).",
+        "fix": "Address negative feedback publicly and dilute with positive reviews.",
+    },
+    {
+        # Spec: "if photos < 10: leak += 10"
+        "id": "few_photos", "field": "photos", "op": "<", "value": 10, "weight": 10,
+        "issue": "Visual Void: <10 Photos (Low Click-Through Rate)",
+        "area": "Low Click-Through Rate (CTR)", "impact": "High",
+        "problem": "Less than 10 photos. Listing looks 'dead'.",
+        "fix": "Upload 10+ high-quality team/interior photos.",
+    },
+    {
+        # Spec: "if no_posts: leak += 10"
+        "id": "no_posts", "field": "posts_active", "op": "falsy", "weight": 10,
+        "issue": "Dead Listing: No recent Google Posts found",
+        "area": "Inactive Engagement Signals", "impact": "Medium",
+        "problem": "No active Google Posts detected.",
+        "fix": "Post 1 offer weekly to trigger algorithm activity signals.",
+    },
+    {
+        # Spec: "if missing_services (represented here by website): leak += 15"
+        "id": "no_website", "field": "has_website", "op": "falsy", "weight": 15,
+        "issue": "Conversion Killer: No Website Linked",
+        "area": "Missed Calls & Walk-ins", "impact": "Critical",
+        "problem": "No Website linked.",
+        "fix": "Link a landing page or website immediately.",
+    },
+    {
+        "id": "unclaimed", "field": "claimed", "op": "falsy", "weight": 20,
+        "issue": "Ownership Risk: Business Profile is Unclaimed",
+        "area": "Ownership Risk", "impact": "Critical",
+        "problem": "Business Profile is Unclaimed.",
+        "fix": "Claim listing immediately to prevent competitor hijack.",
+    },
+]
 
-def check_visual_leak(photos):
-    issues = []
-    score = 0
-    # Spec: "if photos < 10: leak += 10"
-    if photos < 10:
-        score += 10
-        issues.append("Visual Void: <10 Photos (Low Click-Through Rate)")
-    return score, issues
+# Fields the rules may read: lead keys tried in order, and the default when
+# none is present (claimed defaults to True to avoid false alarms).
+FIELDS = {
+    "reviews": (("reviews",), 0),
+    "rating": (("rating",), 0.0),
+    "photos": (("photos", "photos_count"), 0),
+    "posts_active": (("posts_active",), False),
+    "has_website": (("has_website", "website"), False),
+    "claimed": (("claimed",), True),
+}
 
-def check_activity_leak(posts_active):
-    issues = []
-    score = 0
-    # Spec: "if no_posts: leak += 10"
-    if not posts_active:
-        score += 10
-        issues.append("Dead Listing: No recent Google Posts found")
-    return score, issues
+MAX_SCORE = 100
 
-def check_conversion_leak(has_website):
-    issues = []
-    score = 0
-    # Spec: "if missing_services (represented here by website): leak += 15"
-    if not has_website:
-        score += 15
-        issues.append("Conversion Killer: No Website Linked")
-    return score, issues
+# Leak bands shared by every entry point: score > first is severe, > second is moderate
+SEVERE_ABOVE = 60
+MODERATE_ABOVE = 30
@@ -0,0 +1,202 @@
+"""
+Stage-by-stage benchmark of scan -> normalize -> audit -> ROI -> PDF -> storage.
+
+    python -m benchmarks.bench_pipeline --out bench.json
+    python -m benchmarks.bench_pipeline --quick --compare bench.json
+
+Every stage runs on seeded synthetic leads (benchmarks/synthetic.py) and is
+reported as throughput, p50/p99 latency per call and peak traced memory.
+Storage stages run in a throwaway directory, never against the real
+leads_db / scan history. Results are JSON so two versions can be diffed
+(--compare prints the change per stage).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.synthetic import make_leads, make_scans
+from harvester.gbp_data import normalize_gbp_data
+from audit.leakage_index import calculate_rli_score
+from audit.roi_calculator import calculate_money_loss, DEFAULT_AVG_SALE, DEFAULT_EST_CALLS
+from modules import lead_index, pipeline_manager, scan_history
+
+DEFAULT_LEADS = 10000
+DEFAULT_DB_SIZES = (1000, 10000, 100000)
+QUICK_DB_SIZES = (1000, 10000)
+DEFAULT_SCANS = 500
+QUICK_SCANS = 100
+DEFAULT_PDFS = 20
+MEMORY_SAMPLE = 1000      # Calls re-run under tracemalloc (tracing distorts timings, so it is a separate pass)
+LOAD_REPEATS = 3
+
+def summarize(samples_ns, peak_bytes=None):
+    """Throughput and latency percentiles from per-call timings (nanoseconds)."""
+    ordered = sorted(samples_ns)
+    n = len(ordered)
+    total = sum(ordered) / 1e9
+    pick = lambda q: ordered[min(n - 1, int(q * n))] / 1e6
+    return {
+        "n": n,
+        "total_s": round(total, 6),
+        "throughput_per_s": round(n / total, 2) if total else None,
+        "mean_ms": round(total * 1e3 / n, 6) if n else None,
+        "p50_ms": round(pick(0.50), 6) if n else None,
+        "p99_ms": round(pick(0.99), 6) if n else None,
+        "peak_mem_kb": round(peak_bytes / 1024, 1) if peak_bytes is not None else None,
+    }
+
+def time_calls(fn, items):
+    samples = []
+    clock = time.perf_counter_ns
+    for item in items:
+        start = clock()
+        fn(item)
+        samples.append(clock() - start)
+    return samples
+
+def peak_memory(fn, items):
+    tracemalloc.start()
+    try:
+        for item in items: fn(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench(fn, items, memory=True):
+    fn(items[0])  # Warm-up: first call pays imports / rule compilation
+    samples = time_calls(fn, items)
+    return summarize(samples, peak_memory(fn, items[:MEMORY_SAMPLE]) if memory else None)
+
+# --- STAGES ---
+
+def bench_cpu_stages(leads, results):
+    normalized = [normalize_gbp_data(lead) for lead in leads]
+    audits = [calculate_rli_score(data) for data in normalized]
+    results["normalize_gbp_data"] = bench(normalize_gbp_data, leads)
+    results["calculate_rli_score"] = bench(calculate_rli_score, normalized)
+    results["calculate_money_loss"] = bench(lambda a: calculate_money_loss(a["rli_score"], DEFAULT_AVG_SALE, DEFAULT_EST_CALLS), audits)
+    return normalized, audits
+
+def bench_pdf(normalized, audits, count, results):
+    try:
+        from report.pdf_generator import create_audit_pdf
+    except Exception as e:  # WeasyPrint needs Pango/Cairo system libraries
+        results["create_audit_pdf"] = {"skipped": f"{type(e).__name__}: {e}"}
+        return
+    jobs = [(data["name"], audit, calculate_money_loss(audit["rli_score"], DEFAULT_AVG_SALE), "$", data)
+            for data, audit in list(zip(normalized, audits))[:count]]
+    results["create_audit_pdf"] = bench(lambda job: create_audit_pdf(*job), jobs)
+
+def bench_pipeline_store(leads_by_size, results):
+    for size, leads in leads_by_size:
+        pipeline_manager.DB_FILE = f"bench_leads_{size}.sqlite3"
+        samples = time_calls(lambda lead: pipeline_manager.add_lead(dict(lead)), leads)
+        results[f"add_lead@{size}"] = summarize(samples)  # Peak memory is filled in below
+
+        pipeline_manager.load_db()  # Warm the page cache like a running app
+        load_samples = time_calls(lambda _: pipeline_manager.load_db(), range(LOAD_REPEATS))
+        results[f"load_db@{size}"] = summarize(load_samples, peak_memory(lambda _: pipeline_manager.load_db(), [None]))
+
+        # Memory pass after load_db (it grows the pipeline): new keys, so every call really inserts
+        fresh = [dict(lead, place_id=f"MEM_{i}") for i, lead in enumerate(leads[:MEMORY_SAMPLE])]
+        results[f"add_lead@{size}"] = summarize(samples, peak_memory(pipeline_manager.add_lead, fresh))
+
+def bench_save_scan(n_scans, results, buckets=4):
+    """save_scan latency as history grows: one result per quarter of the run."""
+    scans = list(make_scans(n_scans))
+    lead_index.get_stats()  # Create the dedup index up front so its one-off build isn't billed to the first save
+    per_bucket = max(1, n_scans // buckets)
+    for b in range(0, n_scans, per_bucket):
+        chunk = scans[b:b + per_bucket]
+        samples = time_calls(lambda scan: scan_history.save_scan(*scan), chunk)
+        results[f"save_scan@{b}-{b + len(chunk)}"] = summarize(samples, peak_memory(lambda scan: scan_history.save_scan(*scan), chunk[:1]))
+
+# --- REPORTING ---
+
+def environment():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def compare(old, new):
+    """Prints the p50 latency change per stage between two result files."""
+    print(f"{'stage':32} {'p50 old':>10} {'p50 new':>10} {'change':>8}")
+    for name, stage in new["stages"].items():
+        before = old.get("stages", {}).get(name)
+        if not before or "p50_ms" not in stage or "p50_ms" not in before: continue
+        change = (stage["p50_ms"] / before["p50_ms"] - 1) * 100 if before["p50_ms"] else 0.0
+        print(f"{name:32} {before['p50_ms']:10.4f} {stage['p50_ms']:10.4f} {change:+7.1f}%")
+
+def print_table(stages):
+    print(f"{'stage':32} {'n':>7} {'ops/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'peak KB':>10}")
+    for name, s in stages.items():
+        if "skipped" in s:
+            print(f"{name:32} skipped ({s['skipped']})")
+            continue
+        peak = f"{s['peak_mem_kb']:10.1f}" if s["peak_mem_kb"] is not None else f"{'-':>10}"
+        print(f"{name:32} {s['n']:7d} {s['throughput_per_s'] or 0:12.1f} {s['p50_ms']:10.4f} {s['p99_ms']:10.4f} {peak}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leads", type=int, default=DEFAULT_LEADS, help="leads for the normalize/audit/ROI stages")
+    parser.add_argument("--db-sizes", default=",".join(map(str, DEFAULT_DB_SIZES)), help="pipeline sizes for add_lead/load_db")
+    parser.add_argument("--scans", type=int, default=None, help=f"scans saved for the growing-history stage (default {DEFAULT_SCANS})")
+    parser.add_argument("--pdfs", type=int, default=DEFAULT_PDFS, help="audit PDFs rendered (0 to skip)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true", help=f"smaller run (db sizes {QUICK_DB_SIZES}, {QUICK_SCANS} scans unless --scans is given)")
+    parser.add_argument("--out", default=None, help="write the JSON results here")
+    parser.add_argument("--compare", default=None, help="previous JSON results to diff against")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_DB_SIZES if args.quick else tuple(int(s) for s in args.db_sizes.split(",") if s.strip())
+    n_scans = args.scans if args.scans is not None else QUICK_SCANS if args.quick else DEFAULT_SCANS
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    stages = {}
+    leads = make_leads(args.leads, seed=args.seed)
+    normalized, audits = bench_cpu_stages(leads, stages)
+    if args.pdfs: bench_pdf(normalized, audits, args.pdfs, stages)
+
+    # Storage stages write files relative to the working directory: isolate them
+    cwd, db_file = os.getcwd(), pipeline_manager.DB_FILE
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            bench_pipeline_store([(size, make_leads(size, seed=args.seed + size)) for size in sizes], stages)
+            bench_save_scan(n_scans, stages)
+        finally:
+            # Close the throwaway databases before the directory goes away
+            for module in (pipeline_manager, lead_index):
+                conn = getattr(module._local, "conn", None)
+                if conn is not None: conn.close()
+                module._local.conn = None
+            pipeline_manager.DB_FILE = db_file
+            os.chdir(cwd)
+
+    report = {"meta": dict(environment(), seed=args.seed, leads=args.leads, db_sizes=list(sizes), scans=n_scans), "stages": stages}
+    print_table(stages)
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {out}")
+    if baseline:
+        with open(baseline) as f:
+            print()
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
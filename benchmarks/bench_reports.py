@@ -0,0 +1,68 @@
+"""
+Reports-per-second benchmark for the audit PDF renderer.
+
+    python -m benchmarks.bench_reports --count 20
+    python -m benchmarks.bench_reports --count 2000 --html-only
+
+"before" is the pre-template generator itself (benchmarks/legacy_audit_pdf.py):
+f-string HTML with the stylesheet inlined, so WeasyPrint re-parses the CSS
+and builds a fresh font configuration on each render. "after" is
+report.pdf_generator as shipped: compiled Jinja2 template + one pre-parsed
+CSS + one shared FontConfiguration. Both render the same sample lead.
+
+The "html" line times building the HTML alone, the "pdf" line whole
+reports. --html-only skips layout, which dominates the pdf timings.
+"""
+import argparse
+import time
+
+from benchmarks import legacy_audit_pdf
+from report.pdf_generator import create_audit_pdf
+from report.rendering import render_html
+
+SAMPLE_AUDIT = {"rli_score": 65, "leak_level": "CRITICAL REVENUE HEMORRHAGE", "issues": ["Dead Listing: No recent Google Posts found"]}
+SAMPLE_ROI = {"estimated_calls_lost": 19, "monthly_loss_min": 9500, "monthly_loss_max": 14250.0, "annual_loss": 114000}
+SAMPLE_LEAD = {"name": "Benchmark Plumbing", "reviews": 12, "rating": 3.8, "photos": 4, "website": None, "has_website": False}
+SAMPLE_ARGS = ("Benchmark Plumbing", SAMPLE_AUDIT, SAMPLE_ROI, "$", SAMPLE_LEAD)
+# What create_audit_pdf binds into the template for SAMPLE_ARGS
+SAMPLE_CONTEXT = dict(
+    business_name="Benchmark Plumbing", currency="$", rating=3.8, rev_count=12, photo_count=4, has_website=False,
+    competitor_avg_reviews=150, competitor_avg_photos=45, visibility_fail=False, posts_fail=True,
+    reviews_state="fail", photos_state="fail",
+)
+
+def html_before():
+    return legacy_audit_pdf.build_html(*SAMPLE_ARGS)
+
+def html_after():
+    return render_html("audit_report.html", **SAMPLE_CONTEXT)
+
+def render_before():
+    return legacy_audit_pdf.create_audit_pdf(*SAMPLE_ARGS)
+
+def render_after():
+    return create_audit_pdf(*SAMPLE_ARGS)
+
+def reports_per_second(render, count):
+    render()  # Warm-up (first render pays one-off imports/compilation)
+    start = time.perf_counter()
+    for _ in range(count): render()
+    return count / (time.perf_counter() - start)
+
+def report(stage, before_fn, after_fn, count):
+    before = reports_per_second(before_fn, count)
+    after = reports_per_second(after_fn, count)
+    print(f"{stage} before: {before:10.2f} reports/s")
+    print(f"{stage} after:  {after:10.2f} reports/s  ({after / before:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20, help="reports rendered per variant")
+    parser.add_argument("--html-only", action="store_true", help="time HTML building only (no WeasyPrint layout)")
+    args = parser.parse_args()
+
+    report("html", html_before, html_after, args.count)
+    if not args.html_only: report("pdf ", render_before, render_after, args.count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Concurrency stress test for the SQLite pipeline store.
+
+    python -m benchmarks.stress_pipeline
+    python -m benchmarks.stress_pipeline --processes 4 --threads 8 --rounds 40
+
+Several processes, each running several threads (like Streamlit sessions
+spread over app replicas), hammer one throwaway leads database at once.
+Every worker tracks leads of its own, races all the others to add_lead the
+same shared leads, then keeps rewriting its own field and the status of
+every shared lead. Afterwards it checks that:
+  - every lead was stored once, and each shared lead was added by exactly one worker
+  - no update was lost: each shared lead carries every worker's last field value
+  - the lead_totals aggregates still match the rows
+  - no call failed (in particular with "database is locked")
+Exits non-zero on any failure. The real leads_db is never touched.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import make_leads
+from modules import pipeline_manager
+
+DEFAULT_PROCESSES = 4
+DEFAULT_THREADS = 6
+DEFAULT_ROUNDS = 25
+SHARED_LEADS = 20
+OWN_LEADS = 50
+
+def worker(tag, shared, own, rounds):
+    """One session's workload. Returns {tag, added_shared, failed_updates, errors}."""
+    report = {"tag": tag, "added_shared": 0, "failed_updates": 0, "errors": []}
+    try:
+        for lead in own: pipeline_manager.add_lead(dict(lead))
+        for lead in shared: report["added_shared"] += pipeline_manager.add_lead(dict(lead))
+        for r in range(rounds):
+            for lead in shared:
+                pid = lead["place_id"]
+                # A field only this worker writes: merging must never drop it
+                if not pipeline_manager.update_lead(pid, {tag: r}): report["failed_updates"] += 1
+                pipeline_manager.update_lead_status(pid, pipeline_manager.PIPELINE_STATUSES[(r + len(tag)) % len(pipeline_manager.PIPELINE_STATUSES)])
+    except Exception as e:
+        report["errors"].append(f"{type(e).__name__}: {e}")
+    finally:
+        conn = getattr(pipeline_manager._local, "conn", None)
+        if conn is not None: conn.close()
+        pipeline_manager._local.conn = None
+    return report
+
+def run_process(index, db_file, threads, rounds, queue):
+    """Entry point of one worker process: `threads` concurrent workers on the shared database."""
+    pipeline_manager.DB_FILE = db_file
+    shared = shared_leads()
+    reports = [None] * threads
+
+    def run(t):
+        tag = f"w{index}_{t}"
+        own = [dict(lead, place_id=f"{tag}_{i}") for i, lead in enumerate(make_leads(OWN_LEADS, seed=index * 100 + t))]
+        reports[t] = worker(tag, shared, own, rounds)
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for thread in pool: thread.start()
+    for thread in pool: thread.join()
+    queue.put(reports)
+
+def shared_leads():
+    return [dict(lead, place_id=f"shared_{i}") for i, lead in enumerate(make_leads(SHARED_LEADS, seed=7))]
+
+def check(reports, processes, threads, rounds):
+    """Failures found in the final database state (empty list = pass)."""
+    failures = [f"{r['tag']}: {error}" for r in reports for error in r["errors"]]
+    failures += [f"{r['tag']}: {r['failed_updates']} updates gave up after {pipeline_manager.MAX_WRITE_RETRIES} retries" for r in reports if r["failed_updates"]]
+
+    workers = processes * threads
+    if len(reports) != workers: failures.append(f"{len(reports)} worker reports, expected {workers}")
+    added = sum(r["added_shared"] for r in reports)
+    if added != SHARED_LEADS: failures.append(f"shared leads added {added} times, expected {SHARED_LEADS}")
+
+    leads = pipeline_manager.load_db()
+    expected = SHARED_LEADS + workers * OWN_LEADS
+    if len(leads) != expected: failures.append(f"{len(leads)} leads stored, expected {expected}")
+
+    tags = [r["tag"] for r in reports]
+    for lead in leads:
+        if not lead.place_id.startswith("shared_"): continue
+        lost = [tag for tag in tags if lead.get(tag) != rounds - 1]
+        if lost: failures.append(f"{lead.place_id}: lost updates from {', '.join(lost)}")
+        if lead.status not in pipeline_manager.PIPELINE_STATUSES: failures.append(f"{lead.place_id}: bad status {lead.status!r}")
+
+    value, count = pipeline_manager.get_metrics()
+    if count != len(leads) or value != sum(l.get("estimated_value", 0) for l in leads):
+        failures.append(f"lead_totals out of step: {count} leads / {value} value vs {len(leads)} rows")
+    funnel = pipeline_manager.get_funnel()["by_status"]
+    for status in pipeline_manager.PIPELINE_STATUSES:
+        rows = sum(1 for l in leads if l.status == status)
+        if funnel[status]["leads"] != rows: failures.append(f"lead_totals[{status}] = {funnel[status]['leads']}, rows = {rows}")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="worker threads per process")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="update passes over the shared leads per worker")
+    args = parser.parse_args(argv)
+
+    cwd, db_file = os.getcwd(), pipeline_manager.DB_FILE
+    with tempfile.TemporaryDirectory(prefix="stress-") as workdir:
+        os.chdir(workdir)
+        try:
+            path = os.path.join(workdir, "stress_leads.sqlite3")
+            pipeline_manager.DB_FILE = path
+            pipeline_manager.get_metrics()  # Create the schema once, up front
+
+            # Spawn, not fork: children must not inherit this process's SQLite connection
+            ctx = multiprocessing.get_context("spawn")
+            queue = ctx.Queue()
+            procs = [ctx.Process(target=run_process, args=(i, path, args.threads, args.rounds, queue)) for i in range(args.processes)]
+            start = time.perf_counter()
+            for p in procs: p.start()
+            reports = [r for _ in procs for r in queue.get()]
+            for p in procs: p.join()
+            elapsed = time.perf_counter() - start
+
+            failures = check(reports, args.processes, args.threads, args.rounds)
+            failures += [f"worker process exited with {p.exitcode}" for p in procs if p.exitcode]
+        finally:
+            conn = getattr(pipeline_manager._local, "conn", None)
+            if conn is not None: conn.close()
+            pipeline_manager._local.conn = None
+            pipeline_manager.DB_FILE = db_file
+            os.chdir(cwd)
+
+    writes = len(reports) * (OWN_LEADS + SHARED_LEADS + 2 * args.rounds * SHARED_LEADS)
+    print(f"{args.processes} processes x {args.threads} threads, {writes} writes in {elapsed:.1f}s ({writes / elapsed:.0f}/s)")
+    if failures:
+        print(f"FAIL ({len(failures)} problems)", file=sys.stderr)
+        for failure in failures[:50]: print(f"  {failure}", file=sys.stderr)
+        sys.exit(1)
+    print("OK: no lost updates, no lock errors, aggregates consistent")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Seeded synthetic leads in the shapes the app really handles: SerpAPI
+trawl leads (prospector/maps_scraper._simulate_data) and demo prospects
+(modules/prospector.get_prospects, which carry no place_id). The same seed
+always yields the same leads, so benchmark runs are comparable.
+"""
+import random
+
+KEYWORDS = ["Plumber", "Dentist", "Roofer", "Electrician", "Landscaper", "Locksmith", "HVAC", "Chiropractor"]
+LOCATIONS = ["Austin", "Leeds", "Denver", "Toronto", "Sydney", "Mumbai", "Dublin", "Phoenix"]
+STREETS = ["Main St", "Side St", "Broad Ave", "Oak Rd", "High St", "Market Sq", "Park Ln", "King St"]
+
+def trawl_lead(rng, i, keyword, location):
+    """Shape of a maps_scraper lead (see _simulate_data / _clean_result)."""
+    rating = round(rng.uniform(2.5, 4.5), 1)
+    reviews = rng.choice([rng.randint(0, 20), rng.randint(20, 80), rng.randint(80, 400)])
+    photos = rng.choice([0, 1, rng.randint(2, 9), rng.randint(10, 60)])
+    website = rng.choice([None, f"https://{keyword.lower()}-{i}.example.com"])
+    weakness = (1000 if not website else 0) + (500 if rating < 3.5 else 0) + (200 if reviews < 10 else 0) + (100 if photos < 5 else 0)
+    return {
+        "business_name": f"{location} {keyword} #{i}",
+        "place_id": f"SYN_{i:07d}",
+        "rating": rating,
+        "reviews": reviews,
+        "categories": [keyword],
+        "phone": f"555-{i % 10000:04d}",
+        "address": f"{rng.randint(1, 999)} {rng.choice(STREETS)}, {location}",
+        "website": website,
+        "photos_count": photos,
+        "maps_url": "https://google.com/maps",
+        "posts_active": rng.random() < 0.3,
+        "owner_response_rate": 0.5,
+        "weakness_score": weakness,
+    }
+
+def prospect_lead(rng, i, keyword, location):
+    """Shape of a modules/prospector.get_prospects lead (no place_id, no maps_url)."""
+    return {
+        "business_name": f"{keyword} Kings of {location} #{i}",
+        "rating": round(rng.uniform(3.5, 5.0), 1),
+        "reviews": rng.randint(0, 300),
+        "address": f"{rng.randint(1, 999)} {rng.choice(STREETS)}, {location}",
+        "phone": f"+1 555-{i % 10000:04d}",
+        "website": rng.choice([None, "https://example.com"]),
+        "photos_count": rng.randint(0, 60),
+        "posts_active": rng.random() < 0.5,
+    }
+
+def make_leads(n, seed=42, prospect_share=0.2):
+    """`n` leads, mostly trawl-shaped with `prospect_share` of get_prospects-shaped ones."""
+    rng = random.Random(seed)
+    leads = []
+    for i in range(n):
+        keyword, location = rng.choice(KEYWORDS), rng.choice(LOCATIONS)
+        make = prospect_lead if rng.random() < prospect_share else trawl_lead
+        leads.append(make(rng, i, keyword, location))
+    return leads
+
+def make_scans(n_scans, leads_per_scan=20, seed=7):
+    """Yields (keyword, location, leads) like successive DEPLOY SCANs."""
+    rng = random.Random(seed)
+    for s in range(n_scans):
+        keyword, location = rng.choice(KEYWORDS), rng.choice(LOCATIONS)
+        base = s * leads_per_scan
+        yield keyword, location, [trawl_lead(rng, base + i, keyword, location) for i in range(leads_per_scan)]
@@ -1,8 +1,16 @@
+import hashlib
+import re
+
+from harvester.lead import Lead
+from modules.tracing import traced
+
+@traced("normalize")
 def normalize_gbp_data(raw_lead):
     """
     MODULE 2: GBP DATA HARVESTER (FIXED)
     Ensures ALL required keys (website, posts, claimed) are present to prevent KeyErrors.
     """
+    if isinstance(raw_lead, Lead): return raw_lead.normalized()  # Already cleaned at ingestion
     
     # 1. Clean Website Logic
     website_url = raw_lead.get("website")
@@ -45,3 +53,18 @@ def normalize_gbp_data(raw_lead):
         "categories": raw_lead.get("categories", []),
         "place_id": raw_lead.get("place_id", "")
     }
+
+def content_id(name, address, phone):
+    """
+    Stable stand-in for a missing place_id: a hash of the business name,
+    address and phone digits (case and spacing ignored), so the same listing
+    gets the same id in every scan.
+    """
+    parts = [" ".join(str(name or "").lower().split()), " ".join(str(address or "").lower().split()), re.sub(r"\D", "", str(phone or ""))]
+    return "h_" + hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def lead_key(lead):
+    """The dedup key shared by scans, history and the pipeline: place_id, else content_id()."""
+    pid = lead.get("place_id")
+    if pid: return str(pid)
+    return content_id(lead.get("business_name") or lead.get("name"), lead.get("address"), lead.get("phone"))
@@ -0,0 +1,166 @@
+from collections.abc import MutableMapping
+from dataclasses import dataclass, fields
+from operator import attrgetter
+
+# Other spellings of a field seen across sources (SerpAPI, demo prospects, normalized audit data)
+ALIASES = {"name": "business_name", "title": "business_name", "photos": "photos_count"}
+
+@dataclass(slots=True, repr=False)
+class Lead(MutableMapping):
+    """
+    MODULE 2B: LEAD RECORD
+    One business, as scans, history and the pipeline hold it: fixed typed
+    slots instead of a per-lead dict, so tens of thousands of leads fit in a
+    fraction of the memory. Built once at the ingestion boundary (from_dict)
+    where aliases are resolved and rating/reviews/photos are coerced.
+
+    It is also a mutable mapping, so lead["rating"], lead.get("website"),
+    dict(lead) and lead.update(...) keep working. A field left at None counts
+    as absent (get() returns its default), like a key missing from a dict.
+    Keys outside the schema (e.g. a batch job's "audit") live in `extra`.
+    """
+    # Listing (scraper)
+    business_name: str = None
+    place_id: str = None
+    rating: float = 0.0
+    reviews: int = 0
+    photos_count: int = 0
+    categories: list = None
+    phone: str = None
+    address: str = None
+    website: str = None
+    maps_url: str = None
+    posts_active: bool = None
+    claimed: bool = None
+    owner_response_rate: float = None
+    weakness_score: int = None
+    search_location: str = None
+    # Scoring (stamped when tracked)
+    audit_score: int = None
+    monthly_gap: float = None
+    currency: str = None
+    score_key: str = None
+    # CRM
+    status: str = None
+    notes: str = None
+    win_probability: str = None
+    estimated_value: float = None
+    extra: dict = None
+
+    @classmethod
+    def from_dict(cls, raw):
+        """The one conversion from a loose lead dict (any source). Leads pass through unchanged."""
+        if isinstance(raw, Lead): return raw
+        if _FIELD_SET.issuperset(raw):
+            # Already in canonical shape (stored leads): one constructor call
+            lead = cls(**raw)
+            lead.rating, lead.reviews, lead.photos_count = _to_float(lead.rating), _to_int(lead.reviews), _to_int(lead.photos_count)
+            return lead
+        known, extra = {}, None
+        for key, value in raw.items():
+            name = ALIASES.get(key, key)
+            # An alias only fills its field when the canonical key is missing (else it is kept as-is in extra)
+            if name in _FIELD_SET and (name is key or name not in raw): known[name] = value
+            elif extra is None: extra = {key: value}
+            else: extra[key] = value
+        lead = cls(**known, extra=extra)
+        if not lead.photos_count and raw.get("photos"): lead.photos_count = raw["photos"]
+        lead.rating, lead.reviews, lead.photos_count = _to_float(lead.rating), _to_int(lead.reviews), _to_int(lead.photos_count)
+        return lead
+
+    def to_dict(self):
+        """Plain dict of the present fields + extra (what gets stored as JSON)."""
+        data = {name: value for name, value in zip(FIELDS, _get_fields(self)) if value is not None}
+        if self.extra: data.update(self.extra)
+        return data
+
+    def normalized(self):
+        """normalize_gbp_data() for a Lead, straight from the slots (the aliases were resolved on the way in)."""
+        return {
+            "name": self.business_name or "Unknown",
+            "address": self.address or "",
+            "phone": self.phone or "",
+            "website": self.website,
+            "has_website": bool(self.website),
+            "rating": self.rating,
+            "reviews": self.reviews,
+            "photos": self.photos_count,
+            "photos_count": self.photos_count,
+            "posts_active": self.posts_active or False,
+            "claimed": True if self.claimed is None else self.claimed,
+            "categories": self.categories or [],
+            "place_id": self.place_id or "",
+        }
+
+    # --- MAPPING COMPATIBILITY ---
+
+    def __getitem__(self, key):
+        name = ALIASES.get(key, key)
+        if name in _FIELD_SET:
+            value = getattr(self, name)
+            if value is None: raise KeyError(key)
+            return value
+        if self.extra is None: raise KeyError(key)
+        return self.extra[key]
+
+    def get(self, key, default=None):
+        name = ALIASES.get(key, key)
+        if name in _FIELD_SET:
+            value = getattr(self, name)
+            return default if value is None else value
+        return default if self.extra is None else self.extra.get(key, default)
+
+    def __setitem__(self, key, value):
+        name = ALIASES.get(key, key)
+        if name in _FIELD_SET: setattr(self, name, value)
+        elif self.extra is None: self.extra = {key: value}
+        else: self.extra[key] = value
+
+    def __delitem__(self, key):
+        name = ALIASES.get(key, key)
+        if name in _FIELD_SET:
+            if getattr(self, name) is None: raise KeyError(key)
+            setattr(self, name, _DEFAULTS[name])
+        elif self.extra is None: raise KeyError(key)
+        else:
+            del self.extra[key]
+            if not self.extra: self.extra = None
+
+    def __contains__(self, key):
+        return self.get(key) is not None or (self.extra is not None and key in self.extra)
+
+    def __iter__(self):
+        for name, value in zip(FIELDS, _get_fields(self)):
+            if value is not None: yield name
+        if self.extra: yield from self.extra
+
+    def __len__(self):
+        return sum(1 for value in _get_fields(self) if value is not None) + len(self.extra or ())
+
+    def copy(self):
+        return Lead.from_dict(self.to_dict())
+
+    def __repr__(self):
+        return f"Lead({self.to_dict()!r})"
+
+FIELDS = tuple(f.name for f in fields(Lead) if f.name != "extra")
+_FIELD_SET = frozenset(FIELDS)
+_DEFAULTS = {f.name: f.default for f in fields(Lead)}
+_get_fields = attrgetter(*FIELDS)
+
+def _to_float(value):
+    try: return float(value or 0)
+    except (TypeError, ValueError): return 0.0
+
+def _to_int(value):
+    try: return int(value or 0)
+    except (TypeError, ValueError): return 0
+
+def to_leads(items):
+    """Lead.from_dict over a list (the ingestion boundary for scans, history and pipeline reads)."""
+    return [Lead.from_dict(item) for item in items]
+
+def json_default(obj):
+    """`default=` hook for json.dump(s): writes a Lead as its plain dict."""
+    if isinstance(obj, Lead): return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
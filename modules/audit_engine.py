@@ -1,31 +1,15 @@
+from audit.rule_engine import get_engine, issue_text, leak_band
+
+SEVERITIES = {"severe": "High", "moderate": "Medium", "low": "Low"}
+
 def calculate_leakage(business_data):
-    score = 0
-    issues = []
-    
-    # Check Rating
-    if business_data['rating'] < 4.0:
-        score += 25
-        issues.append("Rating is below 4.0 (Trust Issue)")
-    
-    # Check Reviews
-    if business_data['reviews'] < 20:
-        score += 20
-        issues.append("Low review count (Low Authority)")
-        
-    # Check Website
-    if not business_data['website']:
-        score += 20
-        issues.append("No Website listed (Conversion Killer)")
-        
-    # Check Photos
-    if business_data['photos_count'] < 10:
-        score += 15
-        issues.append("Very few photos (Low Engagement)")
-        
+    # Same compiled rule set (audit/rules.py) as the main audit, so scores agree
+    score, fired, values = get_engine().evaluate(business_data)
+
     return {
-        "score": min(score, 100),
-        "severity": "High" if score > 50 else "Medium" if score > 20 else "Low",
-        "issues": issues
+        "score": score,
+        "severity": SEVERITIES[leak_band(score)],
+        "issues": [issue_text(rule, values) for rule in fired]
     }
 
 def calculate_roi_loss(leak_score, avg_sale):
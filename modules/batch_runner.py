@@ -0,0 +1,168 @@
+"""
+Headless batch prospecting: scan, audit and (optionally) render PDFs for a
+CSV of (keyword, location) jobs, with no Streamlit involved.
+
+    python -m modules.batch_runner jobs.csv --out trawl_results --workers 4
+
+The CSV needs `keyword` and `location` columns (a header row is optional;
+without one the columns are keyword, location[, currency]). Each job gets its
+own folder under --out with leads.json (leads + audit + roi) and audits.zip,
+and summary.csv lists every job's outcome.
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from prospector.maps_scraper import scan_leads, scan_area, RateLimiter, PAGES_PER_SECOND
+from harvester.gbp_data import normalize_gbp_data
+from harvester.lead import json_default
+from audit.audit_memo import audit_lead
+from audit.roi_calculator import DEFAULT_AVG_SALE, DEFAULT_EST_CALLS
+from modules.scan_history import save_scan
+from modules.lead_index import new_leads
+from modules.storage import atomic_write_json
+from modules import tracing
+
+DEFAULT_WORKERS = 4     # Scans in flight at once (each keeps its own pages in flight too)
+SUMMARY_FIELDS = ("keyword", "location", "currency", "leads", "avg_score", "monthly_gap", "pdfs", "error", "folder")
+
+def read_jobs(csv_path, default_currency="$"):
+    """Reads [{keyword, location, currency}, ...] from a CSV, with or without a header row."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = [r for r in csv.reader(f) if any(cell.strip() for cell in r)]
+    if not rows: return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    if "keyword" in header and "location" in header:
+        cols = {name: header.index(name) for name in ("keyword", "location", "currency") if name in header}
+        rows = rows[1:]
+    else:
+        cols = {"keyword": 0, "location": 1, "currency": 2}
+
+    jobs = []
+    for r in rows:
+        cell = lambda name: r[cols[name]].strip() if name in cols and cols[name] < len(r) else ""
+        if not cell("keyword") or not cell("location"): continue
+        jobs.append({"keyword": cell("keyword"), "location": cell("location"), "currency": cell("currency") or default_currency})
+    return jobs
+
+def run_job(job, limiter, api_key=None, avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS, save_history=True,
+            new_only=False, grid=None):
+    """
+    Scans and audits one (keyword, location). Returns (leads, errors); each lead carries audit + roi.
+    new_only drops leads already tracked or seen by an earlier scan before they are audited;
+    grid=N scans an N x N tiled area instead of the single city-center trawl.
+    """
+    errors = []
+
+    def progress(step, *rest):
+        error = rest[-1]
+        if error is not None: errors.append(f"{'tile' if grid else 'page'} {step if grid else step + 1}: {error}")
+
+    # No background revalidation: every request goes through the shared limiter and its errors reach the job
+    scan = dict(api_key=api_key, on_progress=progress, limiter=limiter, stale_while_revalidate=False)
+    if grid: scanned = scan_area(job["keyword"], job["location"], grid=grid, **scan)
+    else: scanned = scan_leads(job["keyword"], job["location"], **scan)
+    leads = new_leads(scanned) if new_only else scanned
+    if save_history and scanned: save_scan(job["keyword"], job["location"], scanned)
+
+    for lead in leads:
+        data = normalize_gbp_data(lead)
+        audit, roi = audit_lead(data, avg_sale, est_calls)
+        lead["audit"], lead["roi"], lead["currency"] = audit, roi, job["currency"]
+    return leads, errors
+
+def job_folder(out_dir, job):
+    slug = re.sub(r"[^\w\-]+", "_", f"{job['keyword']}_{job['location']}").strip("_") or "job"
+    return os.path.join(out_dir, slug)
+
+def write_pdfs(folder, leads, pdf_workers=None):
+    """Renders one audit PDF per lead (cached PDFs are reused) into folder/audits.zip. Returns the count."""
+    from report.batch_render import build_zip, lead_job, render_batch  # WeasyPrint only loads when PDFs are wanted
+
+    jobs = [lead_job(lead, lead["currency"]) for lead in leads]
+    with tracing.span("pdf.batch"):  # Renders run in worker processes, so time the whole batch here
+        pdfs = render_batch(jobs, max_workers=pdf_workers)
+    with open(os.path.join(folder, "audits.zip"), "wb") as f:
+        f.write(build_zip([(job[0], pdf) for job, pdf in zip(jobs, pdfs)]))
+    return len(pdfs)
+
+def run_batch(jobs, out_dir, workers=DEFAULT_WORKERS, rate_limit=PAGES_PER_SECOND, api_key=None,
+              with_pdfs=True, pdf_workers=None, save_history=True, new_only=False, grid=None, log=print):
+    """
+    MODULE 1C: HEADLESS BATCH RUNNER
+    Runs `workers` scans at once under one shared page-rate budget. As each
+    scan finishes (in the calling thread) its leads are audited, written to
+    <out_dir>/<keyword_location>/leads.json and, with_pdfs, rendered on a
+    process pool. Returns the summary rows (also written to summary.csv).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    limiter = RateLimiter(rate_limit)
+    summary = []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run_job, job, limiter, api_key, save_history=save_history, new_only=new_only, grid=grid): job for job in jobs}
+        for n, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            folder = job_folder(out_dir, job)
+            row = dict(job, leads=0, avg_score="", monthly_gap=0, pdfs=0, error="", folder=folder)
+            try:
+                leads, errors = future.result()
+                row["error"] = "; ".join(errors)
+                os.makedirs(folder, exist_ok=True)
+                atomic_write_json(os.path.join(folder, "leads.json"), dict(job, leads=leads), indent=2, default=json_default)
+                row["leads"] = len(leads)
+                if leads:
+                    row["avg_score"] = round(sum(l["audit"]["rli_score"] for l in leads) / len(leads), 1)
+                    row["monthly_gap"] = sum(l["roi"]["monthly_loss_min"] for l in leads)
+                    if with_pdfs: row["pdfs"] = write_pdfs(folder, leads, pdf_workers)
+            except Exception as e:
+                row["error"] = "; ".join(filter(None, [row["error"], str(e)]))
+            summary.append(row)
+            log(f"[{n}/{len(jobs)}] {job['keyword']} in {job['location']}: {row['leads']} leads"
+                + (f" (error: {row['error']})" if row["error"] else ""))
+
+    with open(os.path.join(out_dir, "summary.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(summary)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless batch prospecting (scan + audit + PDFs) from a CSV of keyword/location jobs.")
+    parser.add_argument("jobs_csv", help="CSV with keyword, location[, currency] columns")
+    parser.add_argument("--out", default="trawl_results", help="output folder")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="scans run in parallel")
+    parser.add_argument("--rate", type=float, default=PAGES_PER_SECOND, help="SerpAPI requests/second across all scans")
+    parser.add_argument("--currency", default="$", help="currency symbol for jobs without a currency column")
+    parser.add_argument("--pdf-workers", type=int, default=None, help="PDF render processes (default: CPU count)")
+    parser.add_argument("--no-pdf", action="store_true", help="skip PDF rendering")
+    parser.add_argument("--no-history", action="store_true", help="don't record the scans in scan history")
+    parser.add_argument("--grid", type=int, default=None, help="scan an N x N tiled area per location instead of one viewport")
+    parser.add_argument("--new-only", action="store_true", help="skip leads already tracked or seen by an earlier scan")
+    parser.add_argument("--trace", default=None, help="record stage timings and write them here (.prom or .jsonl)")
+    args = parser.parse_args(argv)
+
+    jobs = read_jobs(args.jobs_csv, args.currency)
+    if not jobs:
+        print(f"No jobs found in {args.jobs_csv}", file=sys.stderr)
+        return 1
+    if not os.environ.get("SERPAPI_KEY"):
+        print("SERPAPI_KEY is not set: scans return simulated data.", file=sys.stderr)
+
+    if args.trace: tracing.enable()
+    start = time.perf_counter()
+    summary = run_batch(jobs, args.out, workers=args.workers, rate_limit=args.rate, with_pdfs=not args.no_pdf,
+                        pdf_workers=args.pdf_workers, save_history=not args.no_history, new_only=args.new_only, grid=args.grid)
+    failed = sum(1 for row in summary if row["error"])
+    print(f"{len(summary)} jobs, {sum(row['leads'] for row in summary)} leads, {failed} with errors "
+          f"in {time.perf_counter() - start:.1f}s -> {os.path.join(args.out, 'summary.csv')}")
+    if args.trace: print(f"Stage timings -> {tracing.export(args.trace)}")
+    return 1 if failed == len(summary) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+from harvester.gbp_data import normalize_gbp_data, lead_key
+from audit.audit_memo import audit_lead
+from audit.roi_calculator import DEFAULT_AVG_SALE, DEFAULT_EST_CALLS
+from modules import pipeline_manager
+from modules.rescoring import score_key
+from modules.scan_history import load_scan
+
+def score_lead(lead, currency="$", avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS):
+    """Stamps the fields a tracked lead carries (audit_score, monthly_gap, currency, score_key). Returns the lead."""
+    data = normalize_gbp_data(lead)
+    audit, roi = audit_lead(data, avg_sale, est_calls)
+    lead['audit_score'], lead['monthly_gap'], lead['currency'] = audit['rli_score'], roi['monthly_loss_min'], currency
+    lead['score_key'] = score_key(data, avg_sale, est_calls)
+    return lead
+
+def track_leads(leads, currency="$", upsert=False, avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS):
+    """
+    Scores and tracks a batch of scan leads with one pipeline commit.
+    Without `upsert`, leads already in the pipeline are skipped before they
+    are audited; with it, they are re-scored and refreshed (CRM fields kept).
+    Returns {"added": n, "updated": n, "skipped": n}.
+    """
+    leads = list(leads)
+    if not upsert:
+        tracked = pipeline_manager.tracked_ids(lead_key(l) for l in leads)
+        fresh = [l for l in leads if lead_key(l) not in tracked]
+        added = pipeline_manager.add_leads([score_lead(l, currency, avg_sale, est_calls) for l in fresh])
+        return {"added": added, "updated": 0, "skipped": len(leads) - added}
+
+    result = pipeline_manager.upsert_leads([score_lead(l, currency, avg_sale, est_calls) for l in leads])
+    return dict(result, skipped=len(leads) - result["added"] - result["updated"])
+
+def import_scan(scan_id, currency="$", upsert=False):
+    """Tracks every lead of one scan_history entry (see track_leads). None if the scan isn't in history."""
+    entry = load_scan(scan_id)
+    if entry is None: return None
+    return track_leads(entry.get("leads", []), currency, upsert=upsert)
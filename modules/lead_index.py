@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+from harvester.gbp_data import lead_key
+from modules import pipeline_manager
+
+INDEX_DB_FILE = "lead_index.sqlite3"
+BUSY_TIMEOUT = 30
+LOOKUP_CHUNK = 500   # Keys per IN (...) query
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Global "have we seen this business before" index shared by every scan
+# (app, batch runner, sweep). One row per lead_key: place_id, or the stable
+# content hash for listings without one. Tracked status is not copied here;
+# it is read from the pipeline's own primary key so it can never drift.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    key TEXT PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    times_seen INTEGER NOT NULL DEFAULT 1,
+    last_scan TEXT
+)
+"""
+
+_local = threading.local()
+
+def _get_conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != INDEX_DB_FILE:
+        conn = sqlite3.connect(INDEX_DB_FILE, timeout=BUSY_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        is_new = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'seen'").fetchone()
+        conn.execute(SCHEMA)
+        conn.commit()
+        _local.conn, _local.path = conn, INDEX_DB_FILE
+        if is_new: rebuild_index()
+    return conn
+
+def record_seen(leads, scan_id=None, when=None):
+    """
+    Marks every lead as seen by scan `scan_id` (each key counts once per
+    scan, so replaying a scan is harmless). With no scan_id, only adds keys
+    that are missing, without counting a sighting.
+    """
+    keys = list(dict.fromkeys(lead_key(lead) for lead in leads))
+    if not keys: return
+    now = when or datetime.now().strftime(TIME_FORMAT)
+    rows = [(key, now, now, scan_id) for key in keys]
+    conn = _get_conn()
+    with conn:
+        if scan_id is None:
+            conn.executemany("INSERT OR IGNORE INTO seen (key, first_seen, last_seen, times_seen, last_scan) VALUES (?, ?, ?, 0, ?)", rows)
+            return
+        # TIME_FORMAT sorts as text, so MIN/MAX keep the right bounds in any replay order
+        conn.executemany(
+            "INSERT INTO seen (key, first_seen, last_seen, times_seen, last_scan) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET first_seen = MIN(first_seen, excluded.first_seen), "
+            "last_scan = CASE WHEN excluded.last_seen > last_seen THEN excluded.last_scan ELSE last_scan END, "
+            "last_seen = MAX(last_seen, excluded.last_seen), times_seen = times_seen + 1 "
+            "WHERE last_scan IS NOT excluded.last_scan",
+            rows,
+        )
+
+def lookup(keys):
+    """{key: {first_seen, last_seen, times_seen, last_scan}} for the keys already in the index."""
+    keys = list(dict.fromkeys(str(k) for k in keys))
+    conn = _get_conn()
+    found = {}
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[i:i + LOOKUP_CHUNK]
+        rows = conn.execute(
+            f"SELECT key, first_seen, last_seen, times_seen, last_scan FROM seen WHERE key IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        for key, first, last, times, scan in rows:
+            found[key] = {"first_seen": first, "last_seen": last, "times_seen": times, "last_scan": scan}
+    return found
+
+def mark_leads(leads):
+    """
+    MODULE 1E: GLOBAL DEDUP INDEX
+    Returns {lead_key: {"tracked": bool, "times_seen": int, "last_seen": str|None}}
+    for a batch of leads, from two indexed lookups (seen index + pipeline).
+    Call it before record_seen/save_scan to see what earlier scans found.
+    """
+    keys = [lead_key(lead) for lead in leads]
+    seen = lookup(keys)
+    tracked = pipeline_manager.tracked_ids(keys)
+    return {
+        key: {
+            "tracked": key in tracked,
+            "times_seen": seen.get(key, {}).get("times_seen", 0),
+            "last_seen": seen.get(key, {}).get("last_seen"),
+        }
+        for key in keys
+    }
+
+def new_leads(leads):
+    """Drops leads that are already tracked or were seen by an earlier scan (so they are not re-audited)."""
+    marks = mark_leads(leads)
+    return [lead for lead in leads if not marks[lead_key(lead)]["tracked"] and not marks[lead_key(lead)]["times_seen"]]
+
+def rebuild_index():
+    """Re-seeds the index from scan history and the pipeline."""
+    from modules.scan_history import iter_scans  # scan_history feeds this index on save, so import late
+
+    conn = _get_conn()
+    with conn:
+        conn.execute("DELETE FROM seen")
+    for entry in iter_scans():
+        record_seen(entry.get("leads", []), scan_id=entry.get("id"), when=entry.get("timestamp"))
+    for chunk in pipeline_manager.iter_lead_chunks():
+        record_seen([lead for _, lead, _ in chunk])
+
+def get_stats():
+    row = _get_conn().execute("SELECT COUNT(*), COALESCE(SUM(times_seen > 1), 0) FROM seen").fetchone()
+    return {"keys": row[0], "seen_more_than_once": row[1]}
@@ -1,61 +1,416 @@
 import json
 import os
-import pandas as pd
+import sqlite3
+import threading
 
-DB_FILE = "leads_db.json"
+from harvester.gbp_data import lead_key
+from harvester.lead import Lead, json_default
+from modules.tracing import count, traced
 
-def load_db():
-    if not os.path.exists(DB_FILE):
-        return []
+DB_FILE = "leads_db.sqlite3"
+LEGACY_DB_FILE = "leads_db.json"   # Pre-SQLite store, imported once by migrate_json_db()
+BUSY_TIMEOUT = 30                  # Seconds a writer waits for another session's lock
+MAX_WRITE_RETRIES = 10             # Optimistic update attempts before giving up
+LOOKUP_CHUNK = 500                 # Keys per IN (...) query (stays under SQLite's variable limit)
+PIPELINE_STATUSES = ["New Lead", "Outreach", "Negotiation", "Won", "Lost"]
+
+# query_leads() sort options -> ORDER BY column (rowid breaks ties, so the
+# filter indexes below also deliver the order without a sort step)
+SORTS = {"added": "rowid", "gap": "monthly_gap", "value": "estimated_value", "status": "status"}
+
+# One row per lead. place_id is the primary key, so dedup, updates and deletes
+# are B-tree lookups; the full lead dict lives in `data` and the columns the
+# app filters or sums on are mirrored next to it. `version` is bumped on every
+# write and lets concurrent sessions detect (and merge over) each other's edits.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    place_id TEXT PRIMARY KEY,
+    status TEXT,
+    currency TEXT,
+    monthly_gap REAL,
+    estimated_value REAL,
+    data TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    win_probability TEXT
+)
+"""
+# Filter/sort columns of the Pipeline view, so a page is an index range scan
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS leads_status_gap ON leads (status, monthly_gap)",
+    "CREATE INDEX IF NOT EXISTS leads_currency_gap ON leads (currency, monthly_gap)",
+    "CREATE INDEX IF NOT EXISTS leads_gap ON leads (monthly_gap)",
+)
+_INSERT_COLUMNS = " INTO leads (place_id, status, currency, monthly_gap, estimated_value, win_probability, data) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+# Running aggregates, one row per (status, currency, win_probability) group
+# (NULLs stored as ''), kept exact by triggers inside the same transaction as
+# every insert/update/delete - whichever session or process writes. Dashboard
+# metrics read a handful of rows instead of the whole pipeline.
+TOTALS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lead_totals (
+    status TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    win_probability TEXT NOT NULL,
+    leads INTEGER NOT NULL,
+    value REAL NOT NULL,
+    gap REAL NOT NULL,
+    PRIMARY KEY (status, currency, win_probability)
+)
+"""
+_ADD_TOTALS = """
+    INSERT INTO lead_totals (status, currency, win_probability, leads, value, gap)
+    VALUES (IFNULL(NEW.status, ''), IFNULL(NEW.currency, ''), IFNULL(NEW.win_probability, ''), 1,
+            IFNULL(NEW.estimated_value, 0), IFNULL(NEW.monthly_gap, 0))
+    ON CONFLICT (status, currency, win_probability) DO UPDATE SET
+        leads = leads + 1, value = value + excluded.value, gap = gap + excluded.gap;
+"""
+_SUBTRACT_TOTALS = """
+    UPDATE lead_totals SET leads = leads - 1, value = value - IFNULL(OLD.estimated_value, 0), gap = gap - IFNULL(OLD.monthly_gap, 0)
+    WHERE status = IFNULL(OLD.status, '') AND currency = IFNULL(OLD.currency, '') AND win_probability = IFNULL(OLD.win_probability, '');
+    DELETE FROM lead_totals WHERE leads <= 0;
+"""
+TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS lead_totals_insert AFTER INSERT ON leads BEGIN {_ADD_TOTALS} END",
+    f"CREATE TRIGGER IF NOT EXISTS lead_totals_delete AFTER DELETE ON leads BEGIN {_SUBTRACT_TOTALS} END",
+    "CREATE TRIGGER IF NOT EXISTS lead_totals_update "
+    "AFTER UPDATE OF status, currency, win_probability, estimated_value, monthly_gap ON leads "
+    f"BEGIN {_SUBTRACT_TOTALS} {_ADD_TOTALS} END",
+)
+
+_local = threading.local()
+
+def _get_conn():
+    """Per-thread connection (Streamlit runs each session on its own thread)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_FILE:
+        conn = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT)
+        # WAL: readers never block the writer and a crash mid-write rolls back cleanly
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Rows removed by INSERT OR REPLACE only fire delete triggers with this on
+        conn.execute("PRAGMA recursive_triggers=ON")
+        conn.execute(SCHEMA)
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(leads)")}
+        if "version" not in columns:
+            conn.execute("ALTER TABLE leads ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        if "win_probability" not in columns:
+            conn.execute("ALTER TABLE leads ADD COLUMN win_probability TEXT")
+            rows = conn.execute("SELECT rowid, data FROM leads").fetchall()
+            conn.executemany("UPDATE leads SET win_probability = ? WHERE rowid = ?", [(json.loads(d).get('win_probability'), r) for r, d in rows])
+        for index in INDEXES: conn.execute(index)
+        totals_new = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'lead_totals'").fetchone()
+        conn.execute(TOTALS_SCHEMA)
+        for trigger in TRIGGERS: conn.execute(trigger)
+        if totals_new: _rebuild_totals(conn)
+        conn.commit()
+        _local.conn, _local.path = conn, DB_FILE
+        if os.path.exists(LEGACY_DB_FILE): migrate_json_db(LEGACY_DB_FILE)
+    return conn
+
+def _row(lead):
+    return (
+        lead_key(lead),
+        lead.get('status'),
+        lead.get('currency'),
+        lead.get('monthly_gap'),
+        lead.get('estimated_value'),
+        lead.get('win_probability'),
+        json.dumps(lead, default=json_default),
+    )
+
+def _rebuild_totals(conn):
+    """Recomputes lead_totals from scratch (first run on an existing store; the triggers keep it after that)."""
+    conn.execute("DELETE FROM lead_totals")
+    conn.execute(
+        "INSERT INTO lead_totals (status, currency, win_probability, leads, value, gap) "
+        "SELECT IFNULL(status, ''), IFNULL(currency, ''), IFNULL(win_probability, ''), COUNT(*), "
+        "TOTAL(estimated_value), TOTAL(monthly_gap) FROM leads GROUP BY 1, 2, 3"
+    )
+
+def migrate_json_db(json_path=LEGACY_DB_FILE):
+    """
+    One-shot import of the old leads_db.json into SQLite.
+    Leads already in the store are kept; the JSON file is renamed to
+    `<name>.migrated` afterwards so the import never runs twice.
+    Returns the number of leads imported.
+    """
     try:
-        with open(DB_FILE, "r") as f:
-            return json.load(f)
+        with open(json_path, "r") as f:
+            legacy = json.load(f)
+    except OSError:
+        return 0  # Nothing to migrate (or another session already did it)
     except (json.JSONDecodeError, ValueError):
-        # If file is empty or corrupted, return empty list
-        return []
+        # Keep the damaged file for manual recovery instead of treating it as empty
+        try: os.replace(json_path, json_path + ".corrupt")
+        except FileNotFoundError: pass
+        return 0
+
+    conn = _get_conn()
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE" + _INSERT_COLUMNS,
+            [_row(l) for l in legacy],
+        )
+        imported = conn.total_changes - before
+    try: os.replace(json_path, json_path + ".migrated")
+    except FileNotFoundError: pass
+    return imported
+
+@traced("pipeline.load")
+def load_db():
+    rows = _get_conn().execute("SELECT data FROM leads ORDER BY rowid").fetchall()
+    return [Lead.from_dict(json.loads(r[0])) for r in rows]
 
+@traced("pipeline.save")
 def save_db(data):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    """Replaces the whole pipeline with `data` (bulk rewrite; prefer the per-lead functions)."""
+    conn = _get_conn()
+    with conn:
+        conn.execute("DELETE FROM leads")
+        conn.executemany(
+            "INSERT OR REPLACE" + _INSERT_COLUMNS,
+            [_row(l) for l in data],
+        )
 
+CRM_FIELDS = ('status', 'notes', 'win_probability', 'estimated_value')
+
+def crm_defaults(lead_data):
+    """CRM fields a lead starts its pipeline life with."""
+    return {
+        'status': "New Lead",
+        'notes': "",
+        'win_probability': "High" if (lead_data.get('rating') or 0) < 4.0 else "Medium",
+        'estimated_value': 2000, # Default retainer value
+    }
+
+@traced("pipeline.add")
 def add_lead(lead_data):
-    db = load_db()
-    # Check for duplicates based on place_id
-    if any(l.get('place_id') == lead_data.get('place_id') for l in db):
-        return False
-    
-    # Add CRM fields
-    lead_data['status'] = "New Lead"
-    lead_data['notes'] = ""
-    lead_data['win_probability'] = "High" if lead_data.get('rating', 0) < 4.0 else "Medium"
-    lead_data['estimated_value'] = 2000 # Default retainer value
-    
-    db.append(lead_data)
-    save_db(db)
-    return True
+    return add_leads([lead_data]) == 1
+
+@traced("pipeline.add_many")
+def add_leads(leads):
+    """
+    MODULE 6E: BULK LEAD INGESTION
+    Tracks a batch of leads in one transaction: duplicates (already tracked,
+    or repeated within the batch) are skipped by the primary key itself, CRM
+    defaults are applied to the rest and everything commits once. Leads that
+    were added get their CRM fields filled in place. Returns how many were added.
+    """
+    conn = _get_conn()
+    added = []
+    with conn:
+        # Duplicate check is the primary key itself, so two sessions tracking
+        # the same lead at once can't both insert it
+        for lead in leads:
+            crm = crm_defaults(lead)
+            cur = conn.execute("INSERT OR IGNORE" + _INSERT_COLUMNS, _row(dict(lead, **crm)))
+            if cur.rowcount: added.append((lead, crm))
+    if len(added) < len(leads): count("pipeline.duplicates", len(leads) - len(added))
+
+    for lead, crm in added: lead.update(crm)
+    return len(added)
+
+@traced("pipeline.upsert")
+def upsert_leads(leads):
+    """
+    add_leads that also refreshes leads already tracked: their scraped and
+    scored fields are replaced by the incoming ones while the CRM fields
+    (status, notes, win probability, value) are kept. One transaction; every
+    refreshed lead's version is bumped so open editors merge over it.
+    Returns {"added": n, "updated": n}.
+    """
+    batch = {}
+    for lead in leads: batch.setdefault(lead_key(lead), lead)
+    conn = _get_conn()
+    added = updated = 0
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")  # Read + write as one unit against other sessions
+        existing = {}
+        keys = list(batch)
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[i:i + LOOKUP_CHUNK]
+            rows = conn.execute(f"SELECT place_id, data FROM leads WHERE place_id IN ({','.join('?' * len(chunk))})", chunk)
+            existing.update((pid, json.loads(data)) for pid, data in rows)
+
+        for key, lead in batch.items():
+            stored = existing.get(key)
+            if stored is None:
+                crm = crm_defaults(lead)
+                conn.execute("INSERT" + _INSERT_COLUMNS, _row(dict(lead, **crm)))
+                lead.update(crm)
+                added += 1
+                continue
+            stored.update({k: v for k, v in lead.items() if k not in CRM_FIELDS})
+            _, status, currency, gap, value, win, data = _row(stored)
+            conn.execute(
+                "UPDATE leads SET status = ?, currency = ?, monthly_gap = ?, estimated_value = ?, win_probability = ?, data = ?, "
+                "version = version + 1 WHERE place_id = ?",
+                (status, currency, gap, value, win, data, key),
+            )
+            updated += 1
+    return {"added": added, "updated": updated}
+
+def get_lead(place_id):
+    """Returns (lead, version) for one lead, or (None, None) if it isn't tracked."""
+    row = _get_conn().execute("SELECT data, version FROM leads WHERE place_id = ?", (str(place_id),)).fetchone()
+    if not row: return None, None
+    return Lead.from_dict(json.loads(row[0])), row[1]
+
+@traced("pipeline.update")
+def update_lead(place_id, changes, expected_version=None):
+    """
+    Merges `changes` into one stored lead with optimistic versioning.
+    The write only lands if nobody else wrote the lead since we read it;
+    otherwise we re-read and re-apply, so concurrent edits to different
+    fields merge instead of clobbering each other. Pass `expected_version`
+    (from get_lead) to fail instead of merging. Returns True if applied.
+    """
+    pid = str(place_id)
+    conn = _get_conn()
+    for _ in range(MAX_WRITE_RETRIES):
+        lead, version = get_lead(pid)
+        if lead is None: return False
+        if expected_version is not None and version != expected_version: return False
+
+        lead.update(changes)
+        _, status, currency, gap, value, win, data = _row(lead)
+        with conn:
+            cur = conn.execute(
+                "UPDATE leads SET status = ?, currency = ?, monthly_gap = ?, estimated_value = ?, win_probability = ?, data = ?, "
+                "version = version + 1 WHERE place_id = ? AND version = ?",
+                (status, currency, gap, value, win, data, pid, version),
+            )
+        if cur.rowcount: return True
+    return False
 
 def update_lead_status(place_id, new_status):
-    db = load_db()
-    for lead in db:
-        if lead['place_id'] == place_id:
-            lead['status'] = new_status
-    save_db(db)
+    update_lead(place_id, {'status': new_status})
+
+def _where(status=None, currency=None, min_gap=None, max_gap=None):
+    """WHERE clause + params for the Pipeline filters. status/currency take one value or a list."""
+    clauses, params = [], []
+    for column, wanted in (("status", status), ("currency", currency)):
+        if wanted is None: continue
+        wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+        clauses.append(f"{column} IN ({','.join('?' * len(wanted))})" if wanted else "0")
+        params += wanted
+    if min_gap is not None:
+        clauses.append("monthly_gap >= ?")
+        params.append(min_gap)
+    if max_gap is not None:
+        clauses.append("monthly_gap <= ?")
+        params.append(max_gap)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def count_leads(status=None, currency=None, min_gap=None, max_gap=None):
+    """Number of tracked leads, optionally only those matching the query_leads filters."""
+    where, params = _where(status, currency, min_gap, max_gap)
+    return _get_conn().execute("SELECT COUNT(*) FROM leads" + where, params).fetchone()[0]
+
+@traced("pipeline.query")
+def query_leads(status=None, currency=None, min_gap=None, max_gap=None, sort="added", descending=False, limit=25, offset=0):
+    """
+    MODULE 6C: SERVER-SIDE PIPELINE QUERIES
+    One page of tracked leads, filtered by status, currency and monthly_gap
+    range and sorted by one of SORTS, straight from SQLite. Only `limit`
+    rows are decoded, so the cost follows the page size, not the pipeline size.
+    Use count_leads() with the same filters for the total.
+    """
+    if sort not in SORTS: raise ValueError(f"Unknown sort {sort!r} (expected one of {', '.join(SORTS)})")
+    where, params = _where(status, currency, min_gap, max_gap)
+    direction = " DESC" if descending else ""
+    rows = _get_conn().execute(
+        f"SELECT data FROM leads{where} ORDER BY {SORTS[sort]}{direction}, rowid{direction} LIMIT ? OFFSET ?",
+        params + [int(limit), int(offset)],
+    ).fetchall()
+    return [Lead.from_dict(json.loads(r[0])) for r in rows]
+
+def list_currencies():
+    """Currencies present in the pipeline (for the filter dropdown)."""
+    rows = _get_conn().execute("SELECT DISTINCT currency FROM leads WHERE currency IS NOT NULL ORDER BY currency")
+    return [r[0] for r in rows]
+
+def iter_lead_chunks(chunk_size=500, after_rowid=0):
+    """
+    Yields the pipeline as lists of (rowid, lead, version) in rowid order,
+    starting after `after_rowid`. Each chunk is its own short read, so a long
+    walk never holds a snapshot open against the writers.
+    """
+    conn = _get_conn()
+    while True:
+        rows = conn.execute(
+            "SELECT rowid, data, version FROM leads WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (after_rowid, chunk_size),
+        ).fetchall()
+        if not rows: return
+        yield [(r[0], Lead.from_dict(json.loads(r[1])), r[2]) for r in rows]
+        after_rowid = rows[-1][0]
+
+def tracked_ids(keys):
+    """The subset of `keys` (lead_key values) already in the pipeline - one indexed lookup per chunk."""
+    keys = list(dict.fromkeys(str(k) for k in keys))
+    conn = _get_conn()
+    tracked = set()
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[i:i + LOOKUP_CHUNK]
+        rows = conn.execute(f"SELECT place_id FROM leads WHERE place_id IN ({','.join('?' * len(chunk))})", chunk)
+        tracked.update(r[0] for r in rows)
+    return tracked
 
 def delete_lead(place_id):
-    db = load_db()
-    db = [l for l in db if l['place_id'] != place_id]
-    save_db(db)
+    conn = _get_conn()
+    with conn:
+        conn.execute("DELETE FROM leads WHERE place_id = ?", (str(place_id),))
 
+@traced("pipeline.metrics")
 def get_metrics():
-    db = load_db()
-    df = pd.DataFrame(db)
-    
-    # --- THE FIX IS HERE ---
-    if df.empty:
-        return 0, 0  # Returns exactly 2 values (Value, Count)
-    
-    # Calculate Total Pipeline Value
-    pipeline_value = df['estimated_value'].sum()
-    active_leads = len(df)
-    
-    return pipeline_value, active_leads
+    """(total estimated_value, lead count) from the maintained aggregates - no scan of the leads."""
+    value, leads = _get_conn().execute("SELECT TOTAL(value), TOTAL(leads) FROM lead_totals").fetchone()
+    return value, int(leads)
+
+def get_funnel():
+    """
+    MODULE 6D: PIPELINE ANALYTICS
+    Funnel view of the pipeline from the maintained aggregates (a few dozen
+    rows at most, whatever the pipeline size):
+      leads / value         totals
+      by_status             {status: {leads, value, gap}} in PIPELINE_STATUSES order
+      gap_by_currency       {currency: summed monthly_gap}
+      win_probability       {bucket: leads}
+      stages                [{status, leads, reached, conversion}] along the sales path
+                            (reached = leads at this stage or further; conversion = share
+                            of the previous stage's reached leads that got here)
+      win_rate              Won / (Won + Lost), None until a deal is closed
+    """
+    rows = _get_conn().execute("SELECT status, currency, win_probability, leads, value, gap FROM lead_totals").fetchall()
+    by_status = {s: {"leads": 0, "value": 0.0, "gap": 0.0} for s in PIPELINE_STATUSES}
+    gap_by_currency, win_probability = {}, {}
+    for status, currency, win, leads, value, gap in rows:
+        group = by_status.setdefault(status or None, {"leads": 0, "value": 0.0, "gap": 0.0})
+        group["leads"] += leads
+        group["value"] += value
+        group["gap"] += gap
+        gap_by_currency[currency or None] = gap_by_currency.get(currency or None, 0.0) + gap
+        win_probability[win or None] = win_probability.get(win or None, 0) + leads
+
+    path = [s for s in PIPELINE_STATUSES if s != "Lost"]
+    stages, previous = [], None
+    for i, status in enumerate(path):
+        reached = sum(by_status[s]["leads"] for s in path[i:])
+        stages.append({
+            "status": status,
+            "leads": by_status[status]["leads"],
+            "reached": reached,
+            "conversion": reached / previous if previous else None,
+        })
+        previous = reached
+    won, lost = by_status["Won"]["leads"], by_status["Lost"]["leads"]
+    return {
+        "leads": sum(g["leads"] for g in by_status.values()),
+        "value": sum(g["value"] for g in by_status.values()),
+        "by_status": by_status,
+        "gap_by_currency": gap_by_currency,
+        "win_probability": win_probability,
+        "stages": stages,
+        "win_rate": won / (won + lost) if won + lost else None,
+    }
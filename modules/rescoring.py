@@ -0,0 +1,141 @@
+import os
+import threading
+
+from harvester.gbp_data import normalize_gbp_data, lead_key
+from audit.audit_memo import audit_lead, lead_fingerprint
+from audit.roi_calculator import DEFAULT_AVG_SALE, DEFAULT_EST_CALLS
+from audit.rule_engine import get_engine
+from modules import pipeline_manager
+from modules.storage import atomic_write_json, read_json
+
+CHECKPOINT_FILE = "rescore_checkpoint.json"   # Where an interrupted run picks up again
+CHUNK_SIZE = 200                              # Leads per read + checkpoint
+MAX_LEAD_RETRIES = 3                          # Re-reads when a live session edits the lead mid-rescore
+
+def score_key(data, avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS):
+    """
+    Everything a stored audit_score / monthly_gap depends on: the rule-set
+    version, the rule inputs of this (normalized) lead and the ROI assumptions.
+    Stamped on the lead when it is scored; a mismatch means it is stale.
+    """
+    return f"{get_engine().version}:{lead_fingerprint(data)}:{avg_sale}:{est_calls}"
+
+def rescore_pipeline(avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS, chunk_size=CHUNK_SIZE,
+                     resume=True, on_progress=None, stop_event=None):
+    """
+    MODULE 6B: INCREMENTAL PIPELINE RE-SCORING
+    Recomputes audit_score and monthly_gap for tracked leads whose score_key
+    is stale (rules, lead inputs or ROI assumptions changed); fresh leads are
+    skipped without auditing. Walks the store in rowid chunks and checkpoints
+    after each one, so a stopped or crashed run resumes where it left off.
+    Every write is an optimistic update_lead, so live UI edits are never lost.
+    Returns a report with counts and the monthly_gap delta per currency.
+    """
+    run = f"{get_engine().version}:{avg_sale}:{est_calls}"
+    state = None
+    if resume:
+        saved = read_json(CHECKPOINT_FILE, None)
+        if saved and saved.get("run") == run: state = saved
+    if state is None:
+        state = {
+            "run": run, "after_rowid": 0,
+            "scanned": 0, "rescored": 0, "unchanged": 0, "conflicts": 0, "deleted": 0,
+            "gap_before": {}, "gap_after": {},
+        }
+
+    total = pipeline_manager.count_leads()
+    stopped = False
+    for chunk in pipeline_manager.iter_lead_chunks(chunk_size, state["after_rowid"]):
+        for _, lead, version in chunk:
+            _rescore_lead(lead, version, avg_sale, est_calls, state)
+            state["scanned"] += 1
+        state["after_rowid"] = chunk[-1][0]
+        atomic_write_json(CHECKPOINT_FILE, state)
+        if on_progress: on_progress(state["scanned"], max(total, state["scanned"]))
+        if stop_event is not None and stop_event.is_set():
+            stopped = True
+            break
+
+    if not stopped:
+        try: os.remove(CHECKPOINT_FILE)
+        except FileNotFoundError: pass
+    return _report(state, complete=not stopped)
+
+def _rescore_lead(lead, version, avg_sale, est_calls, state):
+    pid = lead_key(lead)
+    for _ in range(MAX_LEAD_RETRIES):
+        data = normalize_gbp_data(lead)
+        key = score_key(data, avg_sale, est_calls)
+        if lead.get('score_key') == key:
+            state["unchanged"] += 1
+            return
+
+        audit, roi = audit_lead(data, avg_sale, est_calls)
+        changes = {'audit_score': audit['rli_score'], 'monthly_gap': roi['monthly_loss_min'], 'score_key': key}
+        if pipeline_manager.update_lead(pid, changes, expected_version=version):
+            currency = lead.get('currency', "$")
+            for field, gap in (("gap_before", lead.get('monthly_gap') or 0), ("gap_after", changes['monthly_gap'])):
+                state[field][currency] = state[field].get(currency, 0) + gap
+            state["rescored"] += 1
+            return
+
+        # Someone wrote the lead since we read it: score what is there now
+        lead, version = pipeline_manager.get_lead(pid)
+        if lead is None:
+            state["deleted"] += 1
+            return
+    state["conflicts"] += 1
+
+def _report(state, complete):
+    before, after = state["gap_before"], state["gap_after"]
+    return {
+        "complete": complete,
+        "scanned": state["scanned"],
+        "rescored": state["rescored"],
+        "unchanged": state["unchanged"],
+        "conflicts": state["conflicts"],
+        "deleted": state["deleted"],
+        "gap_before": dict(before),
+        "gap_after": dict(after),
+        "value_delta": {cur: after.get(cur, 0) - before.get(cur, 0) for cur in sorted(set(before) | set(after))},
+    }
+
+# --- BACKGROUND JOB (one per process) ---
+_job_lock = threading.Lock()
+_job = {"thread": None, "stop": None, "done": 0, "total": 0, "report": None, "error": None}
+
+def start_background_rescore(avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS):
+    """Starts rescore_pipeline on a daemon thread. Returns False if one is already running."""
+    with _job_lock:
+        if _job["thread"] is not None and _job["thread"].is_alive(): return False
+        stop = threading.Event()
+        _job.update(stop=stop, done=0, total=pipeline_manager.count_leads(), report=None, error=None)
+        thread = threading.Thread(target=_run_job, args=(avg_sale, est_calls, stop), daemon=True, name="pipeline-rescore")
+        _job["thread"] = thread
+    thread.start()
+    return True
+
+def stop_background_rescore():
+    """Asks the running job to stop after its current chunk (it resumes from the checkpoint next time)."""
+    with _job_lock:
+        if _job["stop"] is not None: _job["stop"].set()
+
+def get_rescore_status():
+    with _job_lock:
+        thread = _job["thread"]
+        return {
+            "running": thread is not None and thread.is_alive(),
+            "done": _job["done"],
+            "total": _job["total"],
+            "report": _job["report"],
+            "error": _job["error"],
+        }
+
+def _run_job(avg_sale, est_calls, stop):
+    def progress(done, total):
+        with _job_lock: _job.update(done=done, total=total)
+    try:
+        report = rescore_pipeline(avg_sale, est_calls, on_progress=progress, stop_event=stop)
+        with _job_lock: _job["report"] = report
+    except Exception as e:
+        with _job_lock: _job["error"] = str(e)
@@ -1,42 +1,219 @@
 import json
 import os
-from datetime import datetime
+import uuid
+import warnings
+from datetime import datetime, timedelta
+from itertools import islice
 
-HISTORY_FILE = "scan_history.json"
+from harvester.lead import json_default, to_leads
+from modules.storage import file_lock, read_json
+from modules.lead_index import record_seen
+from modules.tracing import traced
 
+# Append-only store: every scan is one line in LOG_FILE (with its full lead
+# payload) and one small summary line in INDEX_FILE pointing at it by byte
+# offset. Listing history only reads the index; leads are read on demand.
+LOG_FILE = "scan_history.jsonl"
+INDEX_FILE = "scan_history.idx.jsonl"
+LEGACY_HISTORY_FILE = "scan_history.json"   # Old single-array format, imported once
+
+# RETENTION POLICY (applied by compact_history, which save_scan runs automatically
+# once any limit is passed; the slack keeps a full history from being rewritten on every save)
+MAX_SCANS = 1000                   # Keep at most this many scans
+MAX_AGE_DAYS = 180                 # Drop scans older than this
+MAX_LOG_BYTES = 64 * 1024 * 1024   # Compact automatically once the log grows past this
+COMPACT_SLACK_SCANS = 50           # Scans over MAX_SCANS tolerated before compacting
+COMPACT_SLACK_DAYS = 1             # Days past MAX_AGE_DAYS the oldest scan may reach before compacting
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+SUMMARY_FIELDS = ("id", "timestamp", "keyword", "location", "count")
+
+@traced("history.save")
 def save_scan(keyword, location, leads):
     """Saves a search result to the history file."""
     # Create entry
     entry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "id": uuid.uuid4().hex[:12],
+        "timestamp": datetime.now().strftime(TIME_FORMAT),
         "keyword": keyword,
         "location": location,
         "count": len(leads),
         "leads": leads
     }
-    
-    # Load existing
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                history = json.load(f)
-        except:
-            history = []
-            
-    # Prepend new scan (newest first)
-    history.insert(0, entry)
-    
-    # Save
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=4)
-
-def load_history():
-    """Loads all past scans."""
-    if not os.path.exists(HISTORY_FILE):
-        return []
+
+    with file_lock(LOG_FILE):
+        _migrate_legacy()
+        _append(entry)
+        needs_compaction = os.path.getsize(LOG_FILE) > MAX_LOG_BYTES or _past_retention(_read_index())
+
+    record_seen(leads, scan_id=entry["id"], when=entry["timestamp"])
+    if needs_compaction: compact_history()
+    return entry["id"]
+
+def iter_history():
+    """Yields scan summaries (no leads), newest first."""
+    _migrate_if_needed()
+    for summary in reversed(_read_index()):
+        yield {k: summary.get(k) for k in SUMMARY_FIELDS}
+
+@traced("history.load")
+def load_history(limit=None, offset=0):
+    """Loads past scan summaries, newest first, one page at a time. Use load_scan() for the leads."""
+    stop = offset + limit if limit is not None else None
+    return list(islice(iter_history(), offset, stop))
+
+@traced("history.load_scan")
+def load_scan(scan_id):
+    """Loads one full scan (summary + leads) by id, or None if it isn't in history."""
+    _migrate_if_needed()
+    for summary in reversed(_read_index()):
+        if summary.get("id") == scan_id:
+            entry = _read_record(summary)
+            if entry is not None: return _with_leads(entry)
+            # Index is out of step with the log (crash mid-compaction): rebuild and retry
+            with file_lock(LOG_FILE):
+                _rebuild_index()
+            entry = _find_in_log(scan_id)
+            return _with_leads(entry) if entry is not None else None
+    return None
+
+def iter_scans():
+    """Yields every full scan (summary + leads) in history, newest first, one scan in memory at a time."""
+    _migrate_if_needed()
+    for summary in reversed(_read_index()):
+        entry = _read_record(summary)
+        if entry is not None: yield _with_leads(entry)
+
+def iter_scan_leads():
+    """Yields every lead of every scan in history (newest scan first), one scan in memory at a time."""
+    for entry in iter_scans():
+        for lead in entry.get("leads", []):
+            yield lead
+
+def compact_history(max_scans=MAX_SCANS, max_age_days=MAX_AGE_DAYS):
+    """
+    Applies the retention policy: rewrites the log with only the newest
+    `max_scans` scans younger than `max_age_days`. Returns how many scans were dropped.
+    """
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime(TIME_FORMAT)
+
+    with file_lock(LOG_FILE):
+        _migrate_legacy()
+        index = _read_index()
+        keep = [s for s in index if s.get("timestamp", "") >= cutoff][-max_scans:] if max_scans else []
+
+        records = [_read_record(s) for s in keep]
+        records = [r for r in records if r is not None]
+
+        # Log first, then index; load_scan() detects and repairs a crash in between
+        new_index = _write_log(records)
+        _write_index(new_index)
+
+    return len(index) - len(records)
+
+# --- INTERNALS (callers hold the LOG_FILE lock where noted) ---
+
+def _with_leads(entry):
+    entry["leads"] = to_leads(entry.get("leads", []))
+    return entry
+
+def _summary(entry, offset, length):
+    summary = {k: entry.get(k) for k in SUMMARY_FIELDS}
+    summary["offset"], summary["length"] = offset, length
+    return summary
+
+def _append(entry):
+    # Lock held. The log line is durable before the index points at it.
+    line = (json.dumps(entry, default=json_default) + "\n").encode("utf-8")
+    with open(LOG_FILE, "ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(INDEX_FILE, "a") as f:
+        f.write(json.dumps(_summary(entry, offset, len(line))) + "\n")
+
+def _past_retention(index):
+    # Index is in log order, so the first summary is the oldest scan
+    if len(index) > MAX_SCANS + COMPACT_SLACK_SCANS: return True
+    cutoff = (datetime.now() - timedelta(days=MAX_AGE_DAYS + COMPACT_SLACK_DAYS)).strftime(TIME_FORMAT)
+    return bool(index) and index[0].get("timestamp", "") < cutoff
+
+def _read_index():
+    if not os.path.exists(INDEX_FILE): return []
+    index = []
+    with open(INDEX_FILE, "r") as f:
+        for line in f:
+            try: index.append(json.loads(line))
+            except ValueError: continue  # Torn last line from a crash
+    return index
+
+def _read_record(summary):
+    try:
+        with open(LOG_FILE, "rb") as f:
+            f.seek(summary["offset"])
+            entry = json.loads(f.read(summary["length"]))
+    except (OSError, ValueError, KeyError):
+        return None
+    return entry if entry.get("id") == summary.get("id") else None
+
+def _iter_log():
+    if not os.path.exists(LOG_FILE): return
+    with open(LOG_FILE, "rb") as f:
+        offset = 0
+        for line in f:
+            try: yield json.loads(line), offset, len(line)
+            except ValueError: pass
+            offset += len(line)
+
+def _find_in_log(scan_id):
+    for entry, _, _ in _iter_log():
+        if entry.get("id") == scan_id: return entry
+    return None
+
+def _rebuild_index():
+    # Lock held
+    _write_index([_summary(entry, offset, length) for entry, offset, length in _iter_log()])
+
+def _write_log(records):
+    # Lock held. Returns the index for the rewritten log.
+    tmp = LOG_FILE + ".tmp"
+    index, offset = [], 0
+    with open(tmp, "wb") as f:
+        for entry in records:
+            line = (json.dumps(entry) + "\n").encode("utf-8")
+            f.write(line)
+            index.append(_summary(entry, offset, len(line)))
+            offset += len(line)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, LOG_FILE)
+    return index
+
+def _write_index(index):
+    tmp = INDEX_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        f.writelines(json.dumps(s) + "\n" for s in index)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, INDEX_FILE)
+
+def _migrate_if_needed():
+    if os.path.exists(LEGACY_HISTORY_FILE):
+        with file_lock(LOG_FILE):
+            _migrate_legacy()
+
+def _migrate_legacy():
+    # Lock held. One-shot import of scan_history.json (stored newest first).
+    if not os.path.exists(LEGACY_HISTORY_FILE): return
     try:
-        with open(HISTORY_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return []
+        legacy = read_json(LEGACY_HISTORY_FILE, [])
+    except (json.JSONDecodeError, ValueError):
+        # Keep the damaged file for manual recovery and carry on with an empty history
+        os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + ".corrupt")
+        warnings.warn(f"{LEGACY_HISTORY_FILE} is corrupt: moved to {LEGACY_HISTORY_FILE}.corrupt, not imported", RuntimeWarning)
+        return
+    for entry in reversed(legacy):
+        entry.setdefault("id", uuid.uuid4().hex[:12])
+        _append(entry)
+    os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + ".migrated")
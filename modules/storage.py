@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive cross-process lock guarding `path` (held on `<path>.lock`).
+    Use it around every read-modify-write of a shared JSON file so two
+    Streamlit sessions (or two worker processes) never interleave.
+    """
+    lock_path = f"{path}.lock"
+    directory = os.path.dirname(lock_path)
+    if directory: os.makedirs(directory, exist_ok=True)
+
+    with open(lock_path, "a+") as handle:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_json(path, data, indent=None, default=None):
+    """
+    Writes `data` to a temp file next to `path`, fsyncs it, then renames it
+    over `path`. Readers see either the old file or the new one, never a
+    truncated one, even if the process dies mid-write.
+    """
+    _atomic_write(path, lambda f: json.dump(data, f, indent=indent, default=default), ".json")
+
+
+def atomic_write_text(path, text):
+    """atomic_write_json for an already-formatted text file."""
+    _atomic_write(path, lambda f: f.write(text), ".txt")
+
+
+def _atomic_write(path, write, suffix):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=suffix)
+    try:
+        with os.fdopen(fd, "w") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+
+def read_json(path, default):
+    """
+    Loads `path`, returning `default` only when the file does not exist.
+    A corrupt file raises instead of being mistaken for an empty one.
+    """
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
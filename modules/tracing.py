@@ -0,0 +1,183 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+from modules.storage import atomic_write_text
+
+# CONFIGURATION: IN-PROCESS TRACING
+TRACE_ENV = "CRGG_TRACE"       # Set to 1 to record from start-up (the app can also switch it on at runtime)
+RING_SIZE = 2000               # Recent spans kept per stage (old ones roll off)
+METRIC_PREFIX = "crgg"         # Prometheus metric name prefix
+
+# Every stage gets its own ring so a flood of cheap spans (normalize) never
+# pushes the rare expensive ones (WeasyPrint, SerpAPI) out of the window.
+# Counts/sums/errors per stage and the counters are cumulative since start-up.
+_enabled = os.environ.get(TRACE_ENV, "") == "1"
+_lock = threading.Lock()
+_rings = {}                    # stage -> deque of (wall start, seconds, error)
+_totals = {}                   # stage -> [count, total seconds, errors]
+_counters = {}                 # name -> int
+_NOOP = nullcontext()
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+def disable():
+    enable(False)
+
+def is_enabled():
+    return _enabled
+
+class _Span:
+    __slots__ = ("name", "wall", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.wall, self.start = time.time(), time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, self.wall, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+def span(name):
+    """
+    MODULE 7: HOT-PATH TRACING
+    `with span("stage"): ...` times the block into the stage's ring.
+    While tracing is off it returns a shared no-op context (nothing is timed or stored).
+    """
+    return _Span(name) if _enabled else _NOOP
+
+def traced(name):
+    """Decorator form of span(). Disabled cost is one flag check per call."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled: return fn(*args, **kwargs)
+            wall, start, error = time.time(), time.perf_counter(), True
+            try:
+                result = fn(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                _record(name, wall, time.perf_counter() - start, error)
+        return wrapper
+    return decorate
+
+def count(name, n=1):
+    """Bumps a named counter (no-op while tracing is off)."""
+    if not _enabled: return
+    with _lock: _counters[name] = _counters.get(name, 0) + n
+
+def _record(name, wall, seconds, error):
+    with _lock:
+        ring = _rings.get(name)
+        if ring is None: ring = _rings[name] = deque(maxlen=RING_SIZE)
+        ring.append((wall, seconds, error))
+        totals = _totals.setdefault(name, [0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += seconds
+        if error: totals[2] += 1
+
+# --- READING ---
+
+def _pick(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def stage_stats():
+    """
+    {stage: {count, errors, total_s, p50_ms, p99_ms, max_ms, window}} -
+    percentiles over the recent window (the last RING_SIZE spans), counts since start-up.
+    """
+    with _lock:
+        rings = {name: [s for _, s, _ in ring] for name, ring in _rings.items()}
+        totals = {name: list(t) for name, t in _totals.items()}
+    stats = {}
+    for name in sorted(rings):
+        ordered = sorted(rings[name])
+        calls, total, errors = totals[name]
+        stats[name] = {
+            "count": calls,
+            "errors": errors,
+            "total_s": total,
+            "p50_ms": _pick(ordered, 0.50) * 1e3 if ordered else 0.0,
+            "p99_ms": _pick(ordered, 0.99) * 1e3 if ordered else 0.0,
+            "max_ms": ordered[-1] * 1e3 if ordered else 0.0,
+            "window": len(ordered),
+        }
+    return stats
+
+def get_counters():
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+def get_spans(stage=None):
+    """Recent spans, oldest first, as {stage, start, ms, error} dicts."""
+    with _lock:
+        rings = {name: list(ring) for name, ring in _rings.items() if stage is None or name == stage}
+    spans = [
+        {"stage": name, "start": wall, "ms": seconds * 1e3, "error": error}
+        for name, ring in rings.items() for wall, seconds, error in ring
+    ]
+    spans.sort(key=lambda s: s["start"])
+    return spans
+
+def reset():
+    with _lock:
+        _rings.clear()
+        _totals.clear()
+        _counters.clear()
+
+# --- EXPORT ---
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text(gauges=None):
+    """
+    Prometheus text exposition of the stage summaries and counters.
+    `gauges` ({name: number}) adds extra point-in-time values, e.g. cache hit rates.
+    """
+    p = METRIC_PREFIX
+    lines = [
+        f"# HELP {p}_stage_seconds Time spent per traced stage (quantiles over the recent window).",
+        f"# TYPE {p}_stage_seconds summary",
+    ]
+    stats = stage_stats()
+    for stage, s in stats.items():
+        label = f'stage="{_label(stage)}"'
+        lines.append(f'{p}_stage_seconds{{{label},quantile="0.5"}} {s["p50_ms"] / 1e3:.6f}')
+        lines.append(f'{p}_stage_seconds{{{label},quantile="0.99"}} {s["p99_ms"] / 1e3:.6f}')
+        lines.append(f"{p}_stage_seconds_sum{{{label}}} {s['total_s']:.6f}")
+        lines.append(f"{p}_stage_seconds_count{{{label}}} {s['count']}")
+    lines += [f"# HELP {p}_stage_errors_total Traced calls that raised.", f"# TYPE {p}_stage_errors_total counter"]
+    lines += [f'{p}_stage_errors_total{{stage="{_label(stage)}"}} {s["errors"]}' for stage, s in stats.items()]
+    lines += [f"# HELP {p}_events_total Named event counters.", f"# TYPE {p}_events_total counter"]
+    lines += [f'{p}_events_total{{event="{_label(name)}"}} {n}' for name, n in get_counters().items()]
+    if gauges:
+        lines += [f"# TYPE {p}_gauge gauge"]
+        lines += [f'{p}_gauge{{name="{_label(name)}"}} {float(value):.6f}' for name, value in sorted(gauges.items())]
+    return "\n".join(lines) + "\n"
+
+def jsonl_text():
+    """One JSON object per recent span, then one per counter."""
+    records = [dict(s, type="span") for s in get_spans()]
+    records += [{"type": "counter", "name": name, "value": n} for name, n in get_counters().items()]
+    return "".join(json.dumps(r) + "\n" for r in records)
+
+def export(path, gauges=None):
+    """
+    Writes a snapshot to `path`: JSONL when it ends in .jsonl, Prometheus text
+    otherwise (point node_exporter's textfile collector at a .prom file). The
+    file is replaced atomically, so a scraper never reads half of it.
+    """
+    text = jsonl_text() if path.endswith(".jsonl") else prometheus_text(gauges)
+    atomic_write_text(path, text)
+    return path
@@ -0,0 +1,73 @@
+import math
+
+from prospector.http_client import get_json
+from prospector.response_cache import cached_fetch, MISS
+
+SERPAPI_URL = "https://serpapi.com/search"
+
+# CONFIGURATION: GEO TILING
+TILE_ZOOM = "14z"            # Zoom every tile viewport is requested at
+TILE_STEP_DEG = 0.04         # Tile spacing north-south (~4.4 km, about one 14z viewport)
+DEFAULT_GRID = 3             # Tiles per side (3 = 3x3 around the center)
+MAX_GRID = 9
+CENTER_TTL = 30 * 24 * 3600  # Seconds a resolved location center is reused (places don't move)
+
+def resolve_center(location, api_key, limiter=None, base_url=SERPAPI_URL, use_cache=True, stale_while_revalidate=True):
+    """
+    ((lat, lng), billed) for the place the user typed, from a SerpAPI Maps
+    lookup of the location itself: the place result's gps_coordinates, else
+    the mean of the listed results'. Cached for CENTER_TTL. The center is None
+    if the lookup places nothing; a failed lookup (quota, HTTP error) raises.
+    billed is True when a request was paid for (not served from the cache).
+    """
+    params = {"engine": "google_maps", "q": location, "type": "search", "api_key": api_key}
+
+    def fetch():
+        if limiter is not None: limiter.wait()
+        results = get_json(base_url, params=params)
+        coords = (results.get("place_results") or {}).get("gps_coordinates")
+        if coords and "latitude" in coords: return [coords["latitude"], coords["longitude"]]
+        points = [r["gps_coordinates"] for r in results.get("local_results", []) if r.get("gps_coordinates")]
+        if not points: return None
+        return [sum(p["latitude"] for p in points) / len(points), sum(p["longitude"] for p in points) / len(points)]
+
+    if use_cache: center, status = cached_fetch(base_url, params, fetch, ttl=CENTER_TTL, stale_while_revalidate=stale_while_revalidate)
+    else: center, status = fetch(), MISS
+    return (tuple(center) if center else None), status == MISS
+
+def snap(lat, lng, step=TILE_STEP_DEG):
+    """
+    Snaps a point to the global tile lattice. Longitude spacing widens with
+    latitude so tiles stay roughly square. Two sweeps that overlap produce
+    identical tile centers, and so identical `ll` values. Tile pages are
+    requested by keyword + `ll` only (iter_leads pinned=True), so those
+    overlapping tiles share response-cache entries: the response cache
+    doubles as the tile cache.
+    """
+    row = round(lat / step)
+    lat = row * step
+    lng_step = _lng_step(lat, step)
+    return lat, round(lng / lng_step) * lng_step
+
+def tile_grid(lat, lng, grid=DEFAULT_GRID, step=TILE_STEP_DEG, zoom=TILE_ZOOM):
+    """
+    `grid` x `grid` snapped tile viewports (as SerpAPI `ll` strings) around a
+    center, nearest first, so the densest part of the area is scanned first.
+    """
+    grid = max(1, min(int(grid), MAX_GRID))
+    c_lat, c_lng = snap(lat, lng, step)
+    half = (grid - 1) / 2
+    tiles = []
+    for i in range(grid):
+        t_lat = c_lat + (i - half) * step
+        for j in range(grid):
+            t_lat_s, t_lng = snap(t_lat, c_lng + (j - half) * _lng_step(t_lat, step), step)
+            tiles.append((abs(i - half) + abs(j - half), to_ll(t_lat_s, t_lng, zoom)))
+    tiles.sort(key=lambda t: t[0])
+    return list(dict.fromkeys(ll for _, ll in tiles))
+
+def to_ll(lat, lng, zoom=TILE_ZOOM):
+    return f"@{lat:.7f},{lng:.7f},{zoom}"
+
+def _lng_step(lat, step):
+    return step / max(math.cos(math.radians(lat)), 0.01)
@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.tracing import count, traced
+
+# CONFIGURATION: SHARED SERPAPI CLIENT
+POOL_SIZE = 10                 # Keep-alive connections kept per host
+CONNECT_TIMEOUT = 5            # Seconds to open the TCP/TLS connection
+READ_TIMEOUT = 30              # Seconds to wait for SerpAPI to answer
+MAX_RETRIES = 4                # Retries on top of the first attempt
+BACKOFF_BASE = 0.5             # First backoff window in seconds (doubles per attempt)
+BACKOFF_CAP = 8.0              # Never wait longer than this between attempts
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+LATENCY_WINDOW = 500           # Recent request latencies kept for the stats
+
+_session = None
+_session_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "retries": 0,
+    "errors": 0,
+    "total_latency": 0.0,
+    "max_latency": 0.0,
+    "by_status": {},
+}
+_latencies = deque(maxlen=LATENCY_WINDOW)
+
+
+def get_session():
+    """
+    Returns the process-wide keep-alive session.
+    Every SerpAPI caller (Auditor, Prospector, batch jobs) shares this pool,
+    so the TLS handshake is paid once per connection instead of per page.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+@traced("serpapi.request")
+def get_json(url, params=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES):
+    """
+    GETs `url` on the shared session and returns the decoded JSON body.
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff and full jitter (honouring Retry-After); anything
+    still failing after `max_retries` is raised to the caller.
+    """
+    session = get_session()
+
+    for attempt in range(max_retries + 1):
+        if attempt:
+            _count("retries")
+            count("serpapi.retries")
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            _record(time.perf_counter() - start, "error")
+            if attempt == max_retries: raise
+            time.sleep(_backoff_delay(attempt))
+            continue
+
+        _record(time.perf_counter() - start, response.status_code)
+
+        if response.status_code in RETRY_STATUSES and attempt < max_retries:
+            time.sleep(_backoff_delay(attempt, response.headers.get("Retry-After")))
+            continue
+
+        response.raise_for_status()
+        return response.json()
+
+
+def get_stats():
+    """Snapshot of the request counters and latency figures (seconds)."""
+    with _stats_lock:
+        stats = dict(_stats)
+        stats["by_status"] = dict(_stats["by_status"])
+        recent = sorted(_latencies)
+
+    stats["avg_latency"] = stats["total_latency"] / stats["requests"] if stats["requests"] else 0.0
+    stats["p50_latency"] = recent[len(recent) // 2] if recent else 0.0
+    stats["p95_latency"] = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.update(requests=0, retries=0, errors=0, total_latency=0.0, max_latency=0.0, by_status={})
+        _latencies.clear()
+
+
+def _backoff_delay(attempt, retry_after=None):
+    # Respect the server's own hint when it gives one in seconds
+    try:
+        if retry_after is not None: return min(float(retry_after), BACKOFF_CAP)
+    except ValueError:
+        pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _record(latency, status):
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["total_latency"] += latency
+        _stats["max_latency"] = max(_stats["max_latency"], latency)
+        _stats["by_status"][status] = _stats["by_status"].get(status, 0) + 1
+        if status == "error" or (isinstance(status, int) and status >= 400): _stats["errors"] += 1
+        _latencies.append(latency)
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
@@ -1,128 +1,502 @@
-import requests
-import streamlit as st
-import random
+import math
+import os
+import queue
 import urllib.parse
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def find_leads(keyword, location):
+from harvester.gbp_data import content_id, lead_key
+from harvester.lead import Lead, to_leads
+from prospector.geo_tiles import resolve_center, tile_grid, to_ll, DEFAULT_GRID
+from prospector.http_client import get_json
+from prospector.response_cache import cached_fetch, MISS, STALE
+from modules.tracing import count, traced
+
+SERPAPI_URL = "https://serpapi.com/search"
+
+# CONFIGURATION: GO DEEP
+TARGET_LEAD_COUNT = 50  # Aim for 50 bad businesses
+MAX_PAGES = 10          # Scan up to 200 businesses (Deep Trawl)
+PAGE_SIZE = 20          # SerpAPI returns 20 listings per Maps page
+DEFAULT_LL = "@40.7455096,-74.0083012,14z"  # Viewport used when the location can't be placed on the map
+
+# CONFIGURATION: CONCURRENT TRAWL
+MAX_CONCURRENT_PAGES = 3  # Page requests kept in flight at once (1 = serial)
+PAGES_PER_SECOND = 4.0    # Global request ceiling across all in-flight pages
+MAX_CONCURRENT_TILES = 3  # Area scans: tiles trawled at once (each keeps its own pages in flight)
+
+# CONFIGURATION: ADAPTIVE PAGINATION
+# Each page costs one API credit; keep paging a viewport only while the next
+# page is expected to pay for itself in qualifying (<= 4.5 star, new) leads.
+MIN_PAGES = 2             # Pages always read per viewport before judging its yield
+YIELD_SMOOTHING = 0.5     # Weight of the newest page in the running yield (EWMA)
+MIN_PAGE_YIELD = 2.0      # Expected qualifying leads/page below which a viewport is abandoned
+MAX_WIDEN = 4             # Nearby viewports tried once the first one dries up (0 = just stop)
+MAX_DRY_VIEWPORTS = 2     # Stop widening after this many nearby viewports in a row yield too little
+WIDEN_STEP_DEG = 0.05     # How far (degrees, ~5 km) each nearby viewport's center moves
+TRAWL_LOG_SIZE = 200      # Recent trawls kept for get_trawl_log()
+
+
+class RateLimiter:
+    """
+    Spaces request starts at least 1/rate seconds apart (thread-safe).
+    Pass one instance to several concurrent scans to share a single budget.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval: return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+
+
+def find_leads(keyword, location, **kwargs):
     """
     MODULE 1: PROSPECTOR (DEEP TRAWL EDITION)
-    Scans up to 10 Pages (200 listings) to find the rare Low-Rated gems.
-    Strictly filters out anything > 4.5 Stars.
+    Streamlit wrapper around scan_leads: the API key comes from st.secrets
+    and page progress / errors are shown as toasts. Streamlit is imported
+    here, not at module level, so the core stays usable headless.
+    """
+    import streamlit as st
+    return scan_leads(keyword, location, api_key=st.secrets.get("SERPAPI_KEY"), on_progress=_streamlit_progress(st), **kwargs)
+
+def stream_leads(keyword, location, **kwargs):
+    """Streamlit wrapper around iter_leads (yields each page's new leads as it arrives)."""
+    import streamlit as st
+    yield from iter_leads(keyword, location, api_key=st.secrets.get("SERPAPI_KEY"), on_progress=_streamlit_progress(st), **kwargs)
+
+def _streamlit_progress(st):
+    def progress(page, found, error):
+        st.toast(f"Deep Trawl: Scanning Page {page + 1}...", icon="🦈")
+        if error is not None: st.error(f"Error on Page {page+1}: {str(error)}")
+    return progress
+
+def scan_leads(keyword, location, **kwargs):
+    """
+    UI-free Deep Trawl: collects every page from iter_leads (same arguments)
+    and returns the leads weakest-first (highest weakness_score).
+    """
+    cleaned_leads = [lead for page_leads in iter_leads(keyword, location, **kwargs) for lead in page_leads]
+    cleaned_leads.sort(key=lambda x: x['weakness_score'], reverse=True)
+    return cleaned_leads
+
+def iter_leads(keyword, location, api_key=None, on_progress=None, concurrency=MAX_CONCURRENT_PAGES,
+               rate_limit=PAGES_PER_SECOND, limiter=None, base_url=SERPAPI_URL, use_cache=True, ll=None, widen=True,
+               target=TARGET_LEAD_COUNT, pinned=False, stale_while_revalidate=True):
+    """
+    Streaming Deep Trawl core: yields the new (deduped, filtered) leads of
+    each results page as soon as that page is processed, so callers can show
+    page 1 after one round trip. Scans up to 10 Pages (200 listings) to find
+    the rare Low-Rated gems; strictly filters out anything > 4.5 Stars.
+    Leads arrive in page order; apply the weakness_score ordering at the end.
+
+    `api_key` falls back to the SERPAPI_KEY environment variable; with no key
+    at all it yields simulated data. `on_progress(page, leads_so_far, error)`
+    is called from the consuming thread as each page is processed (error is
+    the exception that ended the trawl, else None).
+
+    Pages are fetched `concurrency` at a time under a shared `rate_limit`
+    (requests/second) but always processed in page order, so the dedup,
+    early stop and final ordering match a serial trawl (concurrency=1).
+    Pass a RateLimiter as `limiter` to share one budget across scans.
+    Point `base_url` at a local fake SerpAPI server for testing.
+    Pages already trawled within the cache TTL are served from the on-disk
+    response cache without a network call (or billing) unless use_cache=False.
+    Expired pages are served stale and refreshed on a background thread
+    (billed outside `limiter`) unless stale_while_revalidate=False, which
+    re-fetches them in the trawl itself, through `limiter`.
+    Closing the generator early cancels the pages not yet requested.
+
+    Adaptive pagination: after MIN_PAGES pages a viewport is abandoned once
+    its running yield (EWMA of qualifying leads per page) drops below
+    MIN_PAGE_YIELD, since the next page would not pay for its credit. With
+    `widen`, the trawl then moves to nearby viewports around `ll` instead of
+    stopping. Without `ll` the viewport is centered on `location` itself
+    (resolve_center, cached), falling back to DEFAULT_LL only when the lookup
+    places nothing; a failed lookup (quota, HTTP error) ends the trawl as an
+    error. Page efficiency per trawl is recorded for get_page_stats() /
+    get_trawl_log(); billed_pages includes a billed location lookup.
+
+    With `pinned`, `ll` alone places the search: the query is just the
+    keyword (no "in <location>"), so the pages of a viewport are the same
+    request - and the same response-cache entry - whatever location string
+    the scan was started from. Area tiles use this.
     """
     
-    api_key = st.secrets.get("SERPAPI_KEY")
-    
-    # CONFIGURATION: GO DEEP
-    TARGET_LEAD_COUNT = 50  # Aim for 50 bad businesses
-    MAX_PAGES = 10          # Scan up to 200 businesses (Deep Trawl)
+    api_key = api_key or os.environ.get("SERPAPI_KEY")
     
-    cleaned_leads = []
+    if not api_key:
+        yield _simulate_data(keyword, location)
+        return
+
+    limiter = limiter or RateLimiter(rate_limit)
+    query_location = None if pinned else location
     seen_place_ids = set()
-    
-    if not api_key: return _simulate_data(keyword, location)
+    trawl = {"keyword": keyword, "location": location, "viewports": 0, "pages": 0, "billed_pages": 0,
+             "listings": 0, "qualifying": 0, "bad_listings": 0, "stop": "closed"}
+    try:
+        if ll is None:
+            try: ll, center_billed = _center_ll(location, api_key, limiter, base_url, use_cache, stale_while_revalidate)
+            except Exception as e:
+                # Never trawl (and bill) some other city instead: report it like a failed page
+                if on_progress: on_progress(0, 0, e)
+                trawl["stop"] = "error"
+                return
+            trawl["billed_pages"] += center_billed
 
-    for page in range(MAX_PAGES):
-        
-        # Stop if we have enough
-        if len(cleaned_leads) >= TARGET_LEAD_COUNT: break
-            
-        st.toast(f"Deep Trawl: Scanning Page {page + 1}...", icon="🦈")
-        
-        params = {
-            "engine": "google_maps",
-            "q": f"{keyword} in {location}",
-            "type": "search",
-            "ll": "@40.7455096,-74.0083012,14z",
-            "start": page * 20, 
-            "api_key": api_key
-        }
+        dry_viewports = 0
+        for ll in _viewports(ll, MAX_WIDEN if widen else 0):
+            trawl["viewports"] += 1
+            trawl["stop"] = "closed"
+            first_viewport = trawl["viewports"] == 1
+            if not first_viewport: _bump("widenings")
+            # Nearby viewports start as a one-page probe; prefetch only once they prove productive
+            min_pages = MIN_PAGES if first_viewport else 1
+            window = {"depth": max(1, concurrency) if first_viewport else 1}
+            running_yield = None
+            pages = _iter_pages(keyword, query_location, api_key, window, concurrency, limiter, base_url, use_cache, ll,
+                                stale_while_revalidate)
+            try:
+                for page, local_results, billed, error in pages:
+                    if on_progress: on_progress(trawl["pages"], trawl["qualifying"], error)
+
+                    if error is not None:
+                        trawl["stop"] = "error"
+                        return
+
+                    trawl["pages"] += 1
+                    trawl["billed_pages"] += billed
+                    
+                    if not local_results:
+                        trawl["stop"] = "exhausted"
+                        break
+                    
+                    page_leads = []
+                    for result in local_results:
+                        # One malformed listing must not cost the leads already found
+                        try: lead = _clean_result(result, seen_place_ids)
+                        except Exception:
+                            trawl["bad_listings"] += 1
+                            continue
+                        if lead: page_leads.append(lead)
+                    trawl["listings"] += len(local_results)
+                    trawl["qualifying"] += len(page_leads)
+                    if page_leads: yield page_leads
+
+                    # Stop if we have enough: return before the generator is resumed, so no further page is requested
+                    if trawl["qualifying"] >= target:
+                        trawl["stop"] = "target"
+                        return
+
+                    # Marginal value of the next page = running yield of this viewport
+                    running_yield = len(page_leads) if running_yield is None else (
+                        YIELD_SMOOTHING * len(page_leads) + (1 - YIELD_SMOOTHING) * running_yield)
+                    if page + 1 >= min_pages and running_yield < MIN_PAGE_YIELD:
+                        trawl["stop"] = "yield"
+                        _bump("early_stops")
+                        break
+                    # Borderline yield: stop prefetching pages we will probably not read
+                    window["depth"] = 1 if running_yield < 2 * MIN_PAGE_YIELD else max(1, concurrency)
+                else:
+                    trawl["stop"] = "exhausted"
+            finally:
+                pages.close()
+
+            # Two neighbours in a row with nothing new: the area is saturated
+            dry_viewports = dry_viewports + 1 if not first_viewport and (running_yield or 0) < MIN_PAGE_YIELD else 0
+            if dry_viewports >= MAX_DRY_VIEWPORTS: break
+    finally:
+        _log_trawl(trawl)
+
+def _viewports(ll, widen):
+    """The starting viewport, then up to `widen` neighbours ringed around it (same zoom)."""
+    yield ll
+    if not widen: return
+    lat, lng, zoom = _parse_ll(ll)
+    lng_step = WIDEN_STEP_DEG / max(math.cos(math.radians(lat)), 0.01)
+    ring = [(1, 0), (0, 1), (-1, 0), (0, -1), (1, 1), (-1, 1), (-1, -1), (1, -1)]
+    for n in range(widen):
+        ring_no, (dy, dx) = divmod(n, len(ring))[0] + 1, ring[n % len(ring)]
+        yield to_ll(lat + dy * WIDEN_STEP_DEG * ring_no, lng + dx * lng_step * ring_no, zoom)
+
+def _parse_ll(ll):
+    lat, lng, zoom = ll.lstrip("@").split(",")
+    return float(lat), float(lng), zoom
+
+def _center_ll(location, api_key, limiter, base_url, use_cache, stale_while_revalidate=True):
+    """(ll, billed) for `location`. DEFAULT_LL only when the lookup worked but placed nothing; errors raise."""
+    center, billed = resolve_center(location, api_key, limiter, base_url, use_cache, stale_while_revalidate)
+    return (to_ll(*center) if center else DEFAULT_LL), billed
+
+# --- GEO-TILED AREA SCAN ---
 
+def iter_area_leads(keyword, location, grid=DEFAULT_GRID, api_key=None, on_progress=None, tile_concurrency=MAX_CONCURRENT_TILES,
+                    concurrency=MAX_CONCURRENT_PAGES, rate_limit=PAGES_PER_SECOND, limiter=None, base_url=SERPAPI_URL,
+                    use_cache=True, center=None, stale_while_revalidate=True):
+    """
+    MODULE 1B: GEO-TILED AREA SCAN
+    Splits the area around `location` (or an explicit (lat, lng) `center`)
+    into a `grid` x `grid` lattice of map viewports and trawls them
+    `tile_concurrency` at a time, each with the adaptive single-viewport
+    trawl (no widening: the grid is the widening). Pages are yielded as they
+    arrive from any tile, deduped across tiles by lead_key. Tiles are snapped
+    to a global lattice and searched by keyword alone (pinned), so
+    overlapping area scans reuse cached tile pages even when they were
+    started from different location strings.
+    `on_progress(tiles_done, tiles_total, leads_so_far, error)` is called
+    from the consuming thread as each tile finishes (or once, with 0 tiles,
+    if the location lookup fails - nothing is scanned then).
+    """
+    api_key = api_key or os.environ.get("SERPAPI_KEY")
+    if not api_key:
+        yield _simulate_data(keyword, location)
+        return
+
+    limiter = limiter or RateLimiter(rate_limit)
+    if center is None:
+        try: ll, center_billed = _center_ll(location, api_key, limiter, base_url, use_cache, stale_while_revalidate)
+        except Exception as e:
+            if on_progress: on_progress(0, 0, 0, e)
+            return
+        _bump("billed_pages", center_billed)
+        center = _parse_ll(ll)[:2]
+    tiles = tile_grid(*center, grid=grid)
+
+    arrivals = queue.Queue()
+    stop = threading.Event()
+
+    def run_tile(ll):
+        errors = []
+        pages = iter_leads(
+            keyword, location, api_key=api_key, concurrency=concurrency, limiter=limiter, base_url=base_url,
+            use_cache=use_cache, ll=ll, widen=False, pinned=True, stale_while_revalidate=stale_while_revalidate,
+            on_progress=lambda page, found, error: errors.append(error) if error is not None else None,
+        )
         try:
-            search = requests.get("https://serpapi.com/search", params=params)
-            results = search.json()
-            local_results = results.get("local_results", [])
-            
-            if not local_results: break
-            
-            for result in local_results:
-                
-                # Deduping
-                pid = result.get("place_id")
-                if not pid: pid = str(random.randint(10000,99999))
-                if pid in seen_place_ids: continue
-                seen_place_ids.add(pid)
-
-                # Rating Extraction
-                try: rating = float(result.get("rating", 0))
-                except: rating = 0.0
-                
-                reviews = int(result.get("reviews", 0))
-
-                # --- THE STRICT FILTER (The Wall) ---
-                # If rating is > 4.5, THROW IT AWAY.
-                # We only want 4.5, 4.1, 3.8, etc.
-                if rating > 4.5:
-                    continue 
-
-                # --- DATA EXTRACTION ---
-                photo_data = result.get("photos_link")
-                photos_count = 0
-                if isinstance(photo_data, dict):
-                    photos_count = photo_data.get("count", 0)
-                
-                if photos_count == 0 and result.get("thumbnail"): photos_count = 1
-                if photos_count == 0 and result.get("images"): photos_count = len(result.get("images"))
-
-                website = result.get("website")
-                if not website: website = result.get("links", {}).get("website")
-                if not website: website = result.get("reservations_link")
-
-                phone = result.get("phone")
-                if not phone: phone = result.get("phone_number")
-                if not phone: phone = "N/A"
-
-                maps_url = result.get("gps_coordinates", {}).get("link")
-                if not maps_url:
-                    query = urllib.parse.quote(f"{result.get('title')} {result.get('address')}")
-                    maps_url = f"https://www.google.com/maps/search/?api=1&query={query}"
-
-                # WEAKNESS SCORE
-                weakness_score = 0
-                if not website: weakness_score += 1000 
-                if rating < 3.5: weakness_score += 500
-                if reviews < 10: weakness_score += 200
-                if photos_count < 5: weakness_score += 100
-
-                cleaned_leads.append({
-                    "business_name": result.get("title", "Unknown"),
-                    "place_id": pid,
-                    "rating": rating,
-                    "reviews": reviews,
-                    "categories": [result.get("type", "Business")],
-                    "phone": phone,
-                    "address": result.get("address", "Unknown"),
-                    "website": website,
-                    "photos_count": photos_count,
-                    "maps_url": maps_url,
-                    "posts_active": False,
-                    "owner_response_rate": 0.5,
-                    "weakness_score": weakness_score
-                })
-                
+            for page_leads in pages:
+                arrivals.put(("page", page_leads))
+                if stop.is_set(): break
         except Exception as e:
-            st.error(f"Error on Page {page+1}: {str(e)}")
-            break
-            
-        time.sleep(0.5)
-    
+            errors.append(e)
+        finally:
+            pages.close()
+            arrivals.put(("done", errors[-1] if errors else None))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, tile_concurrency))
+    try:
+        for ll in tiles: pool.submit(run_tile, ll)
+        seen, found, done = set(), 0, 0
+        while done < len(tiles):
+            kind, value = arrivals.get()
+            if kind == "done":
+                done += 1
+                if on_progress: on_progress(done, len(tiles), found, value)
+                continue
+            fresh = []
+            for lead in value:
+                key = lead_key(lead)
+                if key in seen: continue
+                seen.add(key)
+                fresh.append(lead)
+            found += len(fresh)
+            if fresh: yield fresh
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def scan_area(keyword, location, **kwargs):
+    """Collects iter_area_leads (same arguments) and returns the leads weakest-first."""
+    cleaned_leads = [lead for page_leads in iter_area_leads(keyword, location, **kwargs) for lead in page_leads]
     cleaned_leads.sort(key=lambda x: x['weakness_score'], reverse=True)
     return cleaned_leads
 
+def stream_area_leads(keyword, location, **kwargs):
+    """Streamlit wrapper around iter_area_leads (toasts per finished tile)."""
+    import streamlit as st
+
+    def progress(done, total, found, error):
+        st.toast(f"Area Scan: {done}/{total} tiles done ({found} leads)", icon="🗺️")
+        if error is not None: st.error(f"Error in tile {done}: {str(error)}" if total else f"Could not place {location}: {error}")
+
+    yield from iter_area_leads(keyword, location, api_key=st.secrets.get("SERPAPI_KEY"), on_progress=progress, **kwargs)
+
+# --- PAGE EFFICIENCY METRICS ---
+_metrics_lock = threading.Lock()
+_page_stats = {"trawls": 0, "pages": 0, "billed_pages": 0, "listings": 0, "qualifying": 0, "bad_listings": 0, "early_stops": 0, "widenings": 0}
+_trawl_log = deque(maxlen=TRAWL_LOG_SIZE)
+
+def _bump(name, n=1):
+    with _metrics_lock: _page_stats[name] += n
+
+def _log_trawl(trawl):
+    trawl["leads_per_page"] = trawl["qualifying"] / trawl["pages"] if trawl["pages"] else 0.0
+    with _metrics_lock:
+        _trawl_log.append(trawl)
+        _page_stats["trawls"] += 1
+        for name in ("pages", "billed_pages", "listings", "qualifying", "bad_listings"): _page_stats[name] += trawl[name]
+
+def get_page_stats():
+    """Totals since start-up: pages read/billed, qualifying leads per page and per billed page, skipped malformed listings, early stops, widenings."""
+    with _metrics_lock:
+        stats = dict(_page_stats)
+    stats["leads_per_page"] = stats["qualifying"] / stats["pages"] if stats["pages"] else 0.0
+    stats["leads_per_credit"] = stats["qualifying"] / stats["billed_pages"] if stats["billed_pages"] else 0.0
+    return stats
+
+def get_trawl_log():
+    """Per-trawl page metrics (newest last): viewports, pages, billed_pages, listings, qualifying, bad_listings, stop reason."""
+    with _metrics_lock:
+        return [dict(t) for t in _trawl_log]
+
+def reset_page_stats():
+    with _metrics_lock:
+        for name in _page_stats: _page_stats[name] = 0
+        _trawl_log.clear()
+
+def _build_params(keyword, location, page, api_key, ll=DEFAULT_LL):
+    """SerpAPI Maps params for one page. location=None searches the `ll` viewport by keyword alone."""
+    return {
+        "engine": "google_maps",
+        "q": keyword if location is None else f"{keyword} in {location}",
+        "type": "search",
+        "ll": ll,
+        "start": page * PAGE_SIZE, 
+        "api_key": api_key
+    }
+
+@traced("trawl.page")
+def _fetch_page(base_url, params, limiter, use_cache, stale_while_revalidate=True):
+    """
+    Returns (local_results, billed) - billed is False when the page came from
+    the cache. A stale page is served unbilled; its refresh runs (and is
+    billed) in the background and is counted by the response cache.
+    """
+    def fetch():
+        # Only real network calls count against the rate limit
+        limiter.wait()
+        # Shared keep-alive session; transient 429/5xx are retried inside get_json
+        results = get_json(base_url, params=params)
+        return results.get("local_results", [])
+
+    if not use_cache:
+        count("trawl.pages_billed")
+        return fetch(), True
+    results, status = cached_fetch(base_url, params, fetch, stale_while_revalidate=stale_while_revalidate)
+    billed = status == MISS
+    count("trawl.pages_billed" if billed else "trawl.pages_cached")
+    if status == STALE: count("trawl.pages_stale")
+    return results, billed
+
+def _iter_pages(keyword, location, api_key, window, concurrency, limiter, base_url, use_cache, ll=DEFAULT_LL,
+                stale_while_revalidate=True):
+    """
+    Yields (page, local_results, billed, error) in page order while keeping up
+    to window["depth"] requests in flight (the caller may change it between
+    pages, up to `concurrency`, which sizes the pool). Closing the generator
+    cancels any pages that have not started yet.
+    """
+    def fetch(page):
+        return _fetch_page(base_url, _build_params(keyword, location, page, api_key, ll), limiter, use_cache, stale_while_revalidate)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    in_flight = deque()
+    next_page = 0
+    try:
+        while in_flight or next_page < MAX_PAGES:
+            while next_page < MAX_PAGES and len(in_flight) < max(1, window["depth"]):
+                in_flight.append((next_page, pool.submit(fetch, next_page)))
+                next_page += 1
+
+            page, future = in_flight.popleft()
+            try:
+                (local_results, billed), error = future.result(), None
+            except Exception as e:
+                local_results, billed, error = None, False, e
+            yield page, local_results, billed, error
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _clean_result(result, seen_place_ids):
+    """Turns one SerpAPI listing into a Lead, or None if it is a dupe or too strong."""
+    
+    # Deduping
+    pid = result.get("place_id")
+    if not pid: pid = content_id(result.get("title"), result.get("address"), result.get("phone") or result.get("phone_number"))
+    if pid in seen_place_ids: return None
+    seen_place_ids.add(pid)
+
+    # Rating Extraction
+    try: rating = float(result.get("rating") or 0)
+    except (TypeError, ValueError): rating = 0.0
+    
+    try: reviews = int(result.get("reviews") or 0)
+    except (TypeError, ValueError): reviews = 0
+
+    # --- THE STRICT FILTER (The Wall) ---
+    # If rating is > 4.5, THROW IT AWAY.
+    # We only want 4.5, 4.1, 3.8, etc.
+    if rating > 4.5:
+        return None
+
+    # --- DATA EXTRACTION ---
+    photo_data = result.get("photos_link")
+    photos_count = 0
+    if isinstance(photo_data, dict):
+        try: photos_count = int(photo_data.get("count") or 0)
+        except (TypeError, ValueError): photos_count = 0
+    
+    if photos_count == 0 and result.get("thumbnail"): photos_count = 1
+    if photos_count == 0 and result.get("images"): photos_count = len(result.get("images"))
+
+    website = result.get("website")
+    if not website: website = (result.get("links") or {}).get("website")
+    if not website: website = result.get("reservations_link")
+
+    phone = result.get("phone")
+    if not phone: phone = result.get("phone_number")
+    if not phone: phone = "N/A"
+
+    maps_url = (result.get("gps_coordinates") or {}).get("link")
+    if not maps_url:
+        query = urllib.parse.quote(f"{result.get('title')} {result.get('address')}")
+        maps_url = f"https://www.google.com/maps/search/?api=1&query={query}"
+
+    # WEAKNESS SCORE
+    weakness_score = 0
+    if not website: weakness_score += 1000 
+    if rating < 3.5: weakness_score += 500
+    if reviews < 10: weakness_score += 200
+    if photos_count < 5: weakness_score += 100
+
+    return Lead(
+        business_name=result.get("title", "Unknown"),
+        place_id=pid,
+        rating=rating,
+        reviews=reviews,
+        categories=[result.get("type", "Business")],
+        phone=phone,
+        address=result.get("address", "Unknown"),
+        website=website,
+        photos_count=photos_count,
+        maps_url=maps_url,
+        posts_active=False,
+        owner_response_rate=0.5,
+        weakness_score=weakness_score,
+    )
+
 def _simulate_data(keyword, location):
     import time
     time.sleep(1)
-    return [
+    return to_leads([
         {
             "business_name": f"{keyword} Struggler",
             "place_id": "SIM_001",
@@ -137,4 +511,4 @@ def _simulate_data(keyword, location):
             "posts_active": False,
             "weakness_score": 1500
         }
-    ]
+    ])
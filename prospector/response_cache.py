@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from modules.tracing import count
+
+# CONFIGURATION: SERPAPI RESPONSE CACHE
+CACHE_DIR = ".serp_cache"
+CACHE_TTL = 24 * 3600            # Seconds a page is served as fresh
+STALE_GRACE = 7 * 24 * 3600      # Extra seconds a stale page may be served while it refreshes
+MAX_CACHE_ENTRIES = 5000
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+SECRET_PARAMS = {"api_key"}      # Never part of the key, never written to disk
+
+# How cached_fetch answered: only MISS called fetch() in the caller's thread
+HIT, STALE, MISS = "hit", "stale", "miss"
+
+_lock = threading.Lock()
+_index = None                    # key -> size in bytes, least recently used first
+_index_bytes = 0
+_refreshing = set()
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refreshes": 0, "refresh_errors": 0}
+
+
+def cache_key(url, params):
+    """Content address of a request: SHA-256 over the URL and every non-secret param."""
+    public = {k: v for k, v in params.items() if k not in SECRET_PARAMS}
+    blob = json.dumps([url, public], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def cached_fetch(url, params, fetch, ttl=None, stale_while_revalidate=True):
+    """
+    Returns (payload, status) for (url, params), calling `fetch()` on a miss.
+    status is HIT, STALE or MISS and is decided before returning, so the
+    caller can tell whether its own thread made (and paid for) a request.
+    With `stale_while_revalidate`, an expired entry still inside STALE_GRACE
+    is returned immediately (STALE) and refreshed on a background thread;
+    those refreshes are counted separately (stats "refreshes", trace
+    counter "serp_cache.revalidations"). Errors raised by `fetch` are never cached.
+    """
+    if ttl is None: ttl = CACHE_TTL
+    key = cache_key(url, params)
+    entry = _read(key)
+    now = time.time()
+
+    if entry is not None:
+        age = now - entry["stored_at"]
+        if age <= ttl:
+            _count("hits")
+            return entry["payload"], HIT
+        if stale_while_revalidate and age <= ttl + STALE_GRACE:
+            _count("stale_hits")
+            _refresh_in_background(key, url, params, fetch)
+            return entry["payload"], STALE
+
+    _count("misses")
+    payload = fetch()
+    _write(key, url, params, payload)
+    return payload, MISS
+
+
+def get_stats():
+    """Hit/miss/eviction counters plus the current size of the cache."""
+    _load_index()
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"] = len(_index)
+        stats["bytes"] = _index_bytes
+    lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+    return stats
+
+
+def clear_cache():
+    """Deletes every cached response."""
+    global _index_bytes
+    _load_index()
+    with _lock:
+        for key in list(_index):
+            _remove(key)
+        _index.clear()
+        _index_bytes = 0
+
+
+# --- INTERNALS ---
+
+def _path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _load_index():
+    # Built once per process from the files on disk, oldest access first
+    global _index, _index_bytes
+    if _index is not None: return
+    with _lock:
+        if _index is not None: return
+        found = []
+        if os.path.isdir(CACHE_DIR):
+            for item in os.scandir(CACHE_DIR):
+                if item.name.endswith(".json"):
+                    st = item.stat()
+                    found.append((st.st_mtime, item.name[:-5], st.st_size))
+        found.sort()
+        _index = OrderedDict((key, size) for _, key, size in found)
+        _index_bytes = sum(_index.values())
+
+
+def _read(key):
+    _load_index()
+    with _lock:
+        if key not in _index: return None
+        _index.move_to_end(key)
+    try:
+        with open(_path(key), "r") as f:
+            entry = json.load(f)
+        os.utime(_path(key))  # mtime doubles as the LRU clock across restarts
+        return entry
+    except (OSError, ValueError):
+        with _lock:
+            _forget(key)
+        return None
+
+
+def _write(key, url, params, payload):
+    global _index_bytes
+    _load_index()
+    entry = {
+        "stored_at": time.time(),
+        "url": url,
+        "params": {k: v for k, v in params.items() if k not in SECRET_PARAMS},
+        "payload": payload,
+    }
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, _path(key))
+    size = os.path.getsize(_path(key))
+
+    with _lock:
+        _forget(key)
+        _index[key] = size
+        _index_bytes += size
+        # Size-bounded LRU: drop least recently used entries until we fit
+        while len(_index) > 1 and (len(_index) > MAX_CACHE_ENTRIES or _index_bytes > MAX_CACHE_BYTES):
+            old_key = next(iter(_index))
+            _forget(old_key)
+            _remove(old_key)
+            _stats["evictions"] += 1
+
+
+def _forget(key):
+    # Caller holds _lock
+    global _index_bytes
+    size = _index.pop(key, None)
+    if size is not None: _index_bytes -= size
+
+
+def _remove(key):
+    try: os.remove(_path(key))
+    except OSError: pass
+
+
+def _refresh_in_background(key, url, params, fetch):
+    with _lock:
+        if key in _refreshing: return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            _write(key, url, params, fetch())
+            _count("refreshes")
+            count("serp_cache.revalidations")
+        except Exception:
+            _count("refresh_errors")
+            count("serp_cache.revalidation_errors")
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def _count(key):
+    with _lock:
+        _stats[key] += 1
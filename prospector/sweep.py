@@ -0,0 +1,224 @@
+"""
+Sweep scheduler: runs a grid of (keyword, location) scans under one shared
+SerpAPI budget and records each finished scan in scan history.
+
+    python -m prospector.sweep -k plumber -k dentist -l "Austin, TX" -l "Leeds, UK" --quota 5000
+
+Jobs run on a bounded worker pool, highest expected yield first. Every real
+SerpAPI request goes through one rate limiter and is charged to a monthly
+quota persisted on disk (shared by every process on the box). A checkpoint
+records finished jobs, so a crashed or quota-stopped sweep resumes where it
+left off; pages a half-finished job already fetched are served from the
+response cache, so they are not billed twice. Sweeps never serve stale pages
+while refreshing them in the background: a page past its TTL is re-fetched
+in the scan itself, so every request is charged to the sweep's budget.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from prospector.maps_scraper import scan_leads, RateLimiter, PAGES_PER_SECOND
+from modules.scan_history import save_scan, iter_scans
+from modules.storage import atomic_write_json, file_lock, read_json
+
+QUOTA_FILE = "serpapi_quota.json"
+CHECKPOINT_FILE = "sweep_checkpoint.json"
+
+# CONFIGURATION: SWEEP BUDGET
+DEFAULT_WORKERS = 4        # Scans in flight at once
+MONTHLY_QUOTA = 5000       # SerpAPI searches per calendar month (match your plan)
+MAX_JOB_ATTEMPTS = 3       # A job whose pages keep failing is kept as partial after this many runs
+
+# CONFIGURATION: PRIORITY
+LOW_RATING = 4.0           # "Low-rated" lead (same cut as add_lead's High win probability)
+PRIOR_SCANS = 2            # Past scans' weight vs. the global average when estimating yield
+
+
+class QuotaExceeded(Exception):
+    """The monthly SerpAPI request budget is used up."""
+
+
+class MonthlyQuota:
+    """Count of billed SerpAPI requests this calendar month, persisted and shared across processes."""
+
+    def __init__(self, limit=MONTHLY_QUOTA, path=QUOTA_FILE):
+        self.limit = limit
+        self.path = path
+
+    def charge(self):
+        """Reserves one request, or raises QuotaExceeded if the month's budget is spent."""
+        with file_lock(self.path):
+            state = self._load()
+            if state["used"] >= self.limit:
+                raise QuotaExceeded(f"Monthly SerpAPI quota of {self.limit} requests reached ({state['month']})")
+            state["used"] += 1
+            atomic_write_json(self.path, state)
+
+    def used(self):
+        with file_lock(self.path):
+            return self._load()["used"]
+
+    def _load(self):
+        month = datetime.now().strftime("%Y-%m")
+        state = read_json(self.path, {})
+        if state.get("month") != month: state = {"month": month, "used": 0}
+        return state
+
+
+class SweepBudget(RateLimiter):
+    """A RateLimiter that also charges every real request to a MonthlyQuota."""
+
+    def __init__(self, rate, quota):
+        super().__init__(rate)
+        self.quota = quota
+
+    def wait(self):
+        self.quota.charge()   # Fails before the request is sent, so nothing over budget is billed
+        super().wait()
+
+
+def build_grid(keywords, locations):
+    """Every keyword x location pair (duplicates dropped, order kept)."""
+    jobs = [{"keyword": k.strip(), "location": l.strip()} for k in keywords for l in locations if k.strip() and l.strip()]
+    return list({job_key(job): job for job in jobs}.values())
+
+def job_key(job):
+    return f"{job['keyword'].lower()}|{job['location'].lower()}"
+
+def estimate_yields(jobs):
+    """
+    Expected low-rated leads per scan for each job, learned from scan history:
+    the pair's own past scans if it has any, else the keyword's and the
+    location's averages, all shrunk towards the global average.
+    """
+    pairs, keywords, locations = {}, {}, {}
+    total_low = total_scans = 0
+    for entry in iter_scans():
+        low = sum(1 for lead in entry.get("leads", []) if _is_low_rated(lead))
+        kw, loc = str(entry.get("keyword", "")).lower(), str(entry.get("location", "")).lower()
+        for table, key in ((pairs, (kw, loc)), (keywords, kw), (locations, loc)):
+            acc = table.setdefault(key, [0, 0])
+            acc[0] += low
+            acc[1] += 1
+        total_low += low
+        total_scans += 1
+
+    prior = total_low / total_scans if total_scans else 0.0
+    def mean(acc): return (acc[0] + PRIOR_SCANS * prior) / (acc[1] + PRIOR_SCANS)
+
+    yields = {}
+    for job in jobs:
+        kw, loc = job["keyword"].lower(), job["location"].lower()
+        if (kw, loc) in pairs:
+            yields[job_key(job)] = mean(pairs[(kw, loc)])
+        else:
+            known = [mean(table[key]) for table, key in ((keywords, kw), (locations, loc)) if key in table]
+            yields[job_key(job)] = sum(known) / len(known) if known else prior
+    return yields
+
+def _is_low_rated(lead):
+    try: return float(lead.get("rating") or 0) < LOW_RATING
+    except (TypeError, ValueError): return False
+
+def run_sweep(jobs, workers=DEFAULT_WORKERS, rate_limit=PAGES_PER_SECOND, monthly_quota=MONTHLY_QUOTA,
+              api_key=None, checkpoint_path=CHECKPOINT_FILE, quota_path=QUOTA_FILE, log=print):
+    """
+    MODULE 1D: SWEEP SCHEDULER
+    Runs `jobs` ([{keyword, location}, ...]) `workers` at a time, ordered by
+    estimate_yields. Stops submitting new jobs once the monthly quota is hit.
+    Returns {job_key: result}; result has status ("done", "partial", "quota"
+    or "error"), leads, low_rated, scan_id, attempts and error.
+    """
+    sweep_id = hashlib.sha1(json.dumps(sorted(job_key(j) for j in jobs)).encode("utf-8")).hexdigest()[:12]
+    state = read_json(checkpoint_path, None)
+    if not state or state.get("sweep") != sweep_id: state = {"sweep": sweep_id, "jobs": {}}
+    results = state["jobs"]
+
+    pending = [job for job in jobs if results.get(job_key(job), {}).get("status") != "done"]
+    if len(pending) < len(jobs): log(f"Resuming sweep {sweep_id}: {len(jobs) - len(pending)}/{len(jobs)} jobs already done")
+    yields = estimate_yields(pending)
+    pending.sort(key=lambda job: yields[job_key(job)], reverse=True)
+
+    budget = SweepBudget(rate_limit, MonthlyQuota(monthly_quota, quota_path))
+    queue = iter(pending)
+    in_flight = {}
+    out_of_quota = False
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while True:
+            while not out_of_quota and len(in_flight) < max(1, workers):
+                job = next(queue, None)
+                if job is None: break
+                attempts = results.get(job_key(job), {}).get("attempts", 0) + 1
+                in_flight[pool.submit(_run_job, job, budget, api_key, attempts)] = job
+            if not in_flight: break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = in_flight.pop(future)
+                result = future.result()
+                results[job_key(job)] = result
+                atomic_write_json(checkpoint_path, state, indent=2)
+                log(f"{job['keyword']} in {job['location']}: {result['status']}, {result['leads']} leads "
+                    f"({result['low_rated']} low-rated)" + (f" - {result['error']}" if result["error"] else ""))
+                if result["status"] == "quota" and not out_of_quota:
+                    out_of_quota = True
+                    log("Monthly quota reached: finishing in-flight scans, the rest stay queued for the next run")
+
+    if all(results.get(job_key(job), {}).get("status") == "done" for job in jobs):
+        try: os.remove(checkpoint_path)
+        except FileNotFoundError: pass
+    return results
+
+def _run_job(job, budget, api_key, attempts):
+    errors = []
+    result = {"status": "done", "leads": 0, "low_rated": 0, "scan_id": None, "attempts": attempts, "error": ""}
+    try:
+        leads = scan_leads(
+            job["keyword"], job["location"], api_key=api_key, limiter=budget,
+            # Expired pages are re-fetched here, charged to the budget, not revalidated behind its back
+            stale_while_revalidate=False,
+            on_progress=lambda page, found, error: errors.append(error) if error is not None else None,
+        )
+        result["leads"] = len(leads)
+        result["low_rated"] = sum(1 for lead in leads if _is_low_rated(lead))
+        if errors:
+            result["error"] = str(errors[-1])
+            if isinstance(errors[-1], QuotaExceeded): result["status"] = "quota"
+            elif attempts < MAX_JOB_ATTEMPTS: result["status"] = "partial"
+        # Only finished scans go to history; partial ones re-run (from cache) on resume
+        if result["status"] == "done" and leads: result["scan_id"] = save_scan(job["keyword"], job["location"], leads)
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a keyword x location prospecting sweep under one SerpAPI budget.")
+    parser.add_argument("-k", "--keyword", action="append", default=[], help="niche to scan (repeatable)")
+    parser.add_argument("-l", "--location", action="append", default=[], help="city/area to scan (repeatable)")
+    parser.add_argument("--jobs", help="CSV of keyword, location rows (added to the -k/-l grid)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="scans run in parallel")
+    parser.add_argument("--rate", type=float, default=PAGES_PER_SECOND, help="SerpAPI requests/second across all scans")
+    parser.add_argument("--quota", type=int, default=MONTHLY_QUOTA, help="SerpAPI requests allowed per calendar month")
+    args = parser.parse_args(argv)
+
+    jobs = build_grid(args.keyword, args.location)
+    if args.jobs:
+        from modules.batch_runner import read_jobs
+        jobs += [{"keyword": j["keyword"], "location": j["location"]} for j in read_jobs(args.jobs)]
+        jobs = list({job_key(job): job for job in jobs}.values())
+    if not jobs:
+        print("Nothing to sweep: pass -k/-l pairs or --jobs", file=sys.stderr)
+        return 1
+
+    results = run_sweep(jobs, workers=args.workers, rate_limit=args.rate, monthly_quota=args.quota)
+    done = sum(1 for r in results.values() if r["status"] == "done")
+    print(f"{done}/{len(jobs)} jobs done, {sum(r['low_rated'] for r in results.values())} low-rated leads, "
+          f"{MonthlyQuota(args.quota).used()}/{args.quota} requests used this month")
+    return 0 if done == len(jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from harvester.gbp_data import normalize_gbp_data
+from audit.audit_memo import audit_lead
+from audit.roi_calculator import DEFAULT_AVG_SALE, DEFAULT_EST_CALLS
+from report.pdf_cache import lookup_pdf, pdf_cache_key, store_pdf
+from report.pdf_generator import create_audit_pdf
+
+def lead_job(lead, currency, avg_sale=DEFAULT_AVG_SALE, est_calls=DEFAULT_EST_CALLS):
+    """
+    Builds the create_audit_pdf arguments for one raw lead:
+    (business_name, audit, roi, currency, normalized_data).
+    """
+    data = normalize_gbp_data(lead)
+    audit, roi = audit_lead(data, avg_sale, est_calls)
+    return (data['name'], audit, roi, currency, data)
+
+def render_batch(jobs, max_workers=None, on_progress=None):
+    """
+    MODULE 5B: BATCH REPORT RENDERER
+    Renders many audit PDFs at once. Cached PDFs are reused; the rest are
+    fanned out over a process pool (WeasyPrint is CPU-bound and single
+    threaded), and each finished PDF goes back into the PDF cache.
+    `on_progress(done, total)` is called from the calling thread, so it is
+    safe to drive a Streamlit progress bar with it.
+    Returns the PDFs in the same order as `jobs`.
+    """
+    total = len(jobs)
+    keys = [pdf_cache_key(*job) for job in jobs]
+    pdfs = [lookup_pdf(key) for key in keys]
+    missing = [i for i, pdf in enumerate(pdfs) if pdf is None]
+
+    done = total - len(missing)
+    if on_progress: on_progress(done, total)
+    if not missing: return pdfs
+
+    workers = min(max_workers or os.cpu_count() or 1, len(missing))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(create_audit_pdf, *jobs[i]): i for i in missing}
+        for future in as_completed(futures):
+            i = futures[future]
+            pdfs[i] = future.result()
+            store_pdf(keys[i], pdfs[i])
+            done += 1
+            if on_progress: on_progress(done, total)
+
+    return pdfs
+
+def build_zip(named_pdfs):
+    """Packs [(business_name, pdf_bytes), ...] into one ZIP archive (returned as bytes)."""
+    buffer = io.BytesIO()
+    used = set()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, pdf in named_pdfs:
+            base = re.sub(r"[^\w\- ]+", "_", str(name)).strip() or "Business"
+            filename, n = f"{base}_Audit.pdf", 1
+            while filename in used:
+                n += 1
+                filename = f"{base}_Audit_{n}.pdf"
+            used.add(filename)
+            archive.writestr(filename, pdf)
+    return buffer.getvalue()
+
+def export_zip(leads_with_currency, max_workers=None, on_progress=None):
+    """Convenience: [(lead, currency), ...] -> ZIP bytes with one audit PDF per lead."""
+    jobs = [lead_job(lead, currency) for lead, currency in leads_with_currency]
+    pdfs = render_batch(jobs, max_workers=max_workers, on_progress=on_progress)
+    return build_zip([(job[0], pdf) for job, pdf in zip(jobs, pdfs)])
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from report.pdf_generator import create_audit_pdf
+from modules.tracing import traced
+
+# CONFIGURATION: RENDERED PDF CACHE
+CACHE_DIR = ".pdf_cache"
+MAX_MEMORY_BYTES = 64 * 1024 * 1024    # Hot PDFs kept in RAM
+MAX_DISK_BYTES = 512 * 1024 * 1024     # Everything else spills to disk
+RENDER_VERSION = "v4.1"                # Bump when the report layout changes to invalidate old PDFs
+
+_lock = threading.Lock()
+_memory = OrderedDict()                # key -> pdf bytes, least recently used first
+_memory_bytes = 0
+_disk = None                           # key -> size on disk, least recently used first
+_disk_bytes = 0
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "memory_evictions": 0, "disk_evictions": 0}
+
+
+def pdf_cache_key(business_name, audit_result, roi_result, currency, lead_data):
+    """Stable hash of everything create_audit_pdf reads, plus the layout version."""
+    blob = json.dumps(
+        [RENDER_VERSION, business_name, audit_result, roi_result, currency, lead_data],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@traced("pdf.get")
+def get_audit_pdf(business_name, audit_result, roi_result, currency, lead_data):
+    """
+    Drop-in for create_audit_pdf that only runs WeasyPrint on a cache miss.
+    Lookups go RAM -> disk -> render; both tiers are byte-bounded LRUs.
+    """
+    key = pdf_cache_key(business_name, audit_result, roi_result, currency, lead_data)
+
+    pdf = lookup_pdf(key)
+    if pdf is not None: return pdf
+
+    pdf = create_audit_pdf(business_name, audit_result, roi_result, currency, lead_data)
+    store_pdf(key, pdf)
+    return pdf
+
+
+def lookup_pdf(key):
+    """Returns the cached PDF for `key` (RAM first, then disk) or None on a miss."""
+    pdf = _memory_get(key)
+    if pdf is not None:
+        _count("memory_hits")
+        return pdf
+
+    pdf = _disk_get(key)
+    if pdf is not None:
+        _count("disk_hits")
+        _memory_put(key, pdf)
+        return pdf
+
+    _count("misses")
+    return None
+
+
+def store_pdf(key, pdf):
+    """Puts an already rendered PDF into both tiers (used by batch renderers)."""
+    _memory_put(key, pdf)
+    _disk_put(key, pdf)
+
+
+def get_stats():
+    _load_disk_index()
+    with _lock:
+        stats = dict(_stats)
+        stats["memory_entries"], stats["memory_bytes"] = len(_memory), _memory_bytes
+        stats["disk_entries"], stats["disk_bytes"] = len(_disk), _disk_bytes
+    lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+    stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+    return stats
+
+
+# --- MEMORY TIER ---
+
+def _memory_get(key):
+    with _lock:
+        pdf = _memory.get(key)
+        if pdf is not None: _memory.move_to_end(key)
+        return pdf
+
+
+def _memory_put(key, pdf):
+    global _memory_bytes
+    with _lock:
+        old = _memory.pop(key, None)
+        if old is not None: _memory_bytes -= len(old)
+        _memory[key] = pdf
+        _memory_bytes += len(pdf)
+        while len(_memory) > 1 and _memory_bytes > MAX_MEMORY_BYTES:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+            _stats["memory_evictions"] += 1
+
+
+# --- DISK TIER ---
+
+def _path(key):
+    return os.path.join(CACHE_DIR, f"{key}.pdf")
+
+
+def _load_disk_index():
+    # Built once per process, oldest access (mtime) first
+    global _disk, _disk_bytes
+    if _disk is not None: return
+    with _lock:
+        if _disk is not None: return
+        found = []
+        if os.path.isdir(CACHE_DIR):
+            for item in os.scandir(CACHE_DIR):
+                if item.name.endswith(".pdf"):
+                    st = item.stat()
+                    found.append((st.st_mtime, item.name[:-4], st.st_size))
+        found.sort()
+        _disk = OrderedDict((key, size) for _, key, size in found)
+        _disk_bytes = sum(_disk.values())
+
+
+def _disk_get(key):
+    _load_disk_index()
+    with _lock:
+        if key not in _disk: return None
+        _disk.move_to_end(key)
+    try:
+        with open(_path(key), "rb") as f:
+            pdf = f.read()
+        os.utime(_path(key))
+        return pdf
+    except OSError:
+        with _lock:
+            _disk_forget(key)
+        return None
+
+
+def _disk_put(key, pdf):
+    global _disk_bytes
+    _load_disk_index()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, _path(key))
+
+    with _lock:
+        _disk_forget(key)
+        _disk[key] = len(pdf)
+        _disk_bytes += len(pdf)
+        while len(_disk) > 1 and _disk_bytes > MAX_DISK_BYTES:
+            old_key = next(iter(_disk))
+            _disk_forget(old_key)
+            try: os.remove(_path(old_key))
+            except OSError: pass
+            _stats["disk_evictions"] += 1
+
+
+def _disk_forget(key):
+    # Caller holds _lock
+    global _disk_bytes
+    size = _disk.pop(key, None)
+    if size is not None: _disk_bytes -= size
+
+
+def _count(key):
+    with _lock:
+        _stats[key] += 1
@@ -0,0 +1,54 @@
+import os
+import threading
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from modules.tracing import traced
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Compiled once per process: the Environment keeps every template's compiled
+# code in memory (auto_reload off means no per-render stat of the file), and
+# each stylesheet is parsed once against one shared font configuration.
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+)
+_env.filters["thousands"] = lambda value: f"{value:,}"
+
+FONT_CONFIG = FontConfiguration()
+_stylesheets = {}
+_stylesheets_lock = threading.Lock()
+
+
+def get_stylesheet(name):
+    """Pre-parsed WeasyPrint CSS for templates/<name>, shared by every render."""
+    sheet = _stylesheets.get(name)
+    if sheet is None:
+        with _stylesheets_lock:
+            sheet = _stylesheets.get(name)
+            if sheet is None:
+                sheet = CSS(filename=os.path.join(TEMPLATE_DIR, name), font_config=FONT_CONFIG)
+                _stylesheets[name] = sheet
+    return sheet
+
+
+def render_html(template_name, **context):
+    return _env.get_template(template_name).render(**context)
+
+
+@traced("pdf.render")
+def render_pdf(template_name, stylesheet=None, **context):
+    """
+    Binds `context` into a compiled template and lays it out with WeasyPrint.
+    Only data binding and layout happen per report; template compilation,
+    CSS parsing and font resolution are paid once.
+    """
+    html = render_html(template_name, **context)
+    stylesheets = [get_stylesheet(stylesheet)] if stylesheet else []
+    return HTML(string=html, base_url=TEMPLATE_DIR).write_pdf(stylesheets=stylesheets, font_config=FONT_CONFIG)